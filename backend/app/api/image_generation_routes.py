@@ -214,7 +214,7 @@ async def get_status() -> dict:
     - Cache statistics (if enabled)
     """
     try:
-        status_info = nano_banana_service.get_status()
+        status_info = await nano_banana_service.get_status()
         return {
             "status": "operational" if status_info["api_key_configured"] else "unconfigured",
             **status_info
@@ -239,7 +239,7 @@ async def clear_cache() -> dict:
     Returns the number of entries that were cleared.
     """
     try:
-        result = nano_banana_service.clear_cache()
+        result = await nano_banana_service.clear_cache()
         logger.info(f"Cache cleared: {result}")
         return {
             "success": True,
@@ -5,6 +5,7 @@ from pathlib import Path
 import asyncio
 import logging
 from typing import Optional
+import orjson
 
 from ..models.schemas import ProcessVideoRequest, ProcessingResult, JobStatus, ProgressUpdate
 from ..services.depth_service import depth_service
@@ -148,7 +149,7 @@ async def process_video_task(
                             user_id=user_id,
                             action="scan_completed",
                             description=f"Completed room scan: {job_id}",
-                            metadata_json=f'{{"job_id": "{job_id}", "frames": {len(frames)}}}'
+                            metadata_json=orjson.dumps({"job_id": job_id, "frames": len(frames)}).decode()
                         )
                         db.add(activity)
                         await db.commit()
@@ -1,10 +1,8 @@
 """
 API routes for YOLO-based furniture detection.
 """
-import base64
-import io
+import asyncio
 import logging
-from PIL import Image
 from fastapi import APIRouter, HTTPException
 
 from ..models.schemas import (
@@ -15,7 +13,7 @@ from ..models.schemas import (
     PixelBoundingBox,
     Point2D,
 )
-from ..services.yolo_service import yolo_service
+from ..services.yolo_service import yolo_service, detection_batcher
 
 logger = logging.getLogger(__name__)
 
@@ -34,18 +32,15 @@ async def detect_furniture(request: DetectFurnitureRequest):
     making it easy to overlay markers on the original canvas.
     """
     try:
-        # Decode base64 image to get dimensions
-        image_data = request.image_base64
-        if "," in image_data:
-            image_data = image_data.split(",", 1)[1]
-
-        image_bytes = base64.b64decode(image_data)
-        image = Image.open(io.BytesIO(image_bytes))
-        image_width, image_height = image.size
-
-        # Run detection
-        raw_detections = yolo_service.detect_from_base64(
-            request.image_base64,
+        # Decode once off the event loop; the array also gives the dimensions
+        image = await asyncio.to_thread(
+            yolo_service.decode_base64_image, request.image_base64
+        )
+        image_height, image_width = image.shape[:2]
+
+        # Run detection (batched with concurrent requests)
+        raw_detections = await detection_batcher.detect(
+            image,
             confidence_threshold=request.confidence_threshold,
             iou_threshold=request.iou_threshold,
         )
@@ -86,5 +81,6 @@ async def yolo_status():
 @router.post("/unload")
 async def unload_yolo_model():
     """Unload YOLO model to free memory."""
-    yolo_service.unload_model()
+    # Blocks until any running inference or model load/export finishes
+    await asyncio.to_thread(yolo_service.unload_model)
     return {"status": "unloaded"}
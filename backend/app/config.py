@@ -49,6 +49,13 @@ class Settings(BaseSettings):
     completion_extrapolate: bool = True     # Fill top regions (ceiling in room scans)
     completion_blur_type: str = "bilateral" # "bilateral" (edge-preserving) or "gaussian" (faster)
 
+    # Frame decoding for scans: "opencv" (default; one sequential pass,
+    # frame-accurate for any codec), "opencv-parallel" (seek-based parallel
+    # runs; exact for intra-only codecs such as MJPEG, but seeks can land a few
+    # frames off on inter-coded H.264/HEVC with B-frames) or "decord"
+    # (keyframe-aware batch decoding, requires the optional decord package)
+    video_decoder: str = "opencv"
+
     temp_dir: Path = Path("/tmp/garaza")
     # CORS origins - add your frontend URLs here
     # For development, includes localhost. For production, add your domain.
@@ -70,9 +77,35 @@ class Settings(BaseSettings):
     gemini_image_size: str = "2K"
     gemini_aspect_ratio: str = "16:9"
     gemini_request_timeout: int = 120
+    gemini_max_concurrent_requests: int = 4  # Concurrent Gemini generations per process
     enable_image_generation_cache: bool = True
     image_generation_cache_ttl_hours: float = 24.0
     image_generation_cache_max_size: int = 100
+    image_generation_cache_max_bytes: int = 512 * 1024 * 1024  # Total payload budget (512MB)
+    # "memory" (per-process, for dev) or "redis" (shared across workers)
+    image_generation_cache_backend: str = "memory"
+    image_generation_cache_redis_url: str = "redis://localhost:6379/0"
+
+    # Furniture search embeddings
+    # "model2vec" (static embeddings, sub-millisecond query encoding) or
+    # "sentence-transformers" (MiniLM transformer, for quality comparisons)
+    furniture_embedding_backend: str = "model2vec"
+    furniture_static_model_name: str = "minishlab/potion-base-8M"
+    furniture_transformer_model_name: str = "all-MiniLM-L6-v2"
+
+    # YOLO furniture detection: run a TensorRT FP16 engine on CUDA (exported
+    # once on first load; requires the tensorrt package)
+    yolo_tensorrt: bool = False
+    # Otherwise optionally run an exported ONNX model on ONNX Runtime (CUDA or
+    # CPU pods without TensorRT; requires onnxruntime / onnxruntime-gpu)
+    yolo_onnx: bool = False
+    # Otherwise optionally torch.compile the PyTorch model (CUDA graphs)
+    yolo_compile: bool = False
+    # Concurrent detection requests are coalesced into one forward pass
+    yolo_max_batch_size: int = 8
+    yolo_batch_wait_ms: float = 5.0
+    # Load the model and run one dummy inference in the background at startup
+    yolo_warm_up: bool = True
 
     # JWT Authentication settings
     secret_key: str = secrets.token_urlsafe(32)
@@ -17,6 +17,8 @@ from .api.room_routes import router as room_router
 from .api.yolo_routes import router as yolo_router
 from .api.image_generation_routes import router as image_generation_router
 from .db.database import init_db
+from .services.furniture_search import furniture_search_service
+from .services.yolo_service import yolo_service
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -58,6 +60,15 @@ async def lifespan(app: FastAPI):
     settings.temp_dir.mkdir(parents=True, exist_ok=True)
     logger.info(f"Temp directory created: {settings.temp_dir}")
 
+    # Warm up furniture search (CSV, embedding model, product embeddings)
+    # in the background so the first search doesn't pay for it
+    furniture_search_service.warm_up_in_background()
+
+    # Load YOLO and run a dummy inference so the first detection is fast
+    # (also runs any one-time TensorRT/ONNX export at startup)
+    if settings.yolo_warm_up:
+        yolo_service.warm_up_in_background()
+
     yield
 
     # Shutdown: Cleanup
@@ -69,56 +69,70 @@ class DepthService:
         if colors is None:
             raise RuntimeError("DA3 prediction missing processed_images")
 
-        all_points = []
-        all_colors = []
         N, H, W = depth.shape
 
+        # First pass: valid-depth masks, so the output buffers can be
+        # allocated once and each frame written straight into its slice
+        valid_masks = []
         for i in range(N):
+            z = np.asarray(depth[i], dtype=np.float32).reshape(-1)
+            valid_masks.append((z > 0) & np.isfinite(z))
+        counts = [int(valid.sum()) for valid in valid_masks]
+        total = sum(counts)
+
+        if total == 0:
+            raise RuntimeError("No valid points found in prediction")
+
+        all_points = np.empty((total, 3), dtype=np.float64)
+        all_colors = np.empty((total, 3), dtype=np.float64)
+
+        # Pixel grid is shared by every frame
+        u, v = np.meshgrid(np.arange(W), np.arange(H))
+        u = u.reshape(-1)
+        v = v.reshape(-1)
+
+        offset = 0
+        for i in range(N):
+            valid = valid_masks[i]
+            count = counts[i]
+            if count == 0:
+                continue
+
             K = np.asarray(intrinsics[i], dtype=np.float64)
             ext = self._as_homogeneous44(np.asarray(extrinsics[i], dtype=np.float64))
             c2w = np.linalg.inv(ext)
 
-            # Create pixel grid
-            u, v = np.meshgrid(np.arange(W), np.arange(H))
-            z = np.asarray(depth[i], dtype=np.float32).flatten()
-            valid = (z > 0) & np.isfinite(z)
-
-            if not valid.any():
-                continue
+            # Convert from OpenCV convention to glTF/OpenGL convention:
+            # OpenCV: Y-down, Z-forward (into scene)
+            # glTF:   Y-up, Z-backward (toward viewer)
+            # Flipping world Y and Z is folded into the camera-to-world
+            # matrix (negate its Y and Z rows) so no extra pass over points
+            c2w[1:3, :] *= -1
 
             # Unproject to 3D camera coordinates
             fx, fy = K[0, 0], K[1, 1]
             cx, cy = K[0, 2], K[1, 2]
-            u_flat = u.flatten()[valid]
-            v_flat = v.flatten()[valid]
-            z_valid = z[valid]
+            z_valid = np.asarray(depth[i], dtype=np.float32).reshape(-1)[valid]
 
-            x = (u_flat - cx) * z_valid / fx
-            y = (v_flat - cy) * z_valid / fy
+            x = (u[valid] - cx) * z_valid / fx
+            y = (v[valid] - cy) * z_valid / fy
 
-            # Transform to world coordinates
-            pts_cam = np.stack([x, y, z_valid, np.ones_like(x)], axis=1)
-            pts_world = (c2w @ pts_cam.T).T[:, :3]
+            # Transform to world coordinates (rotation + translation, no Nx4
+            # homogeneous copy of the points)
+            pts_cam = np.stack([x, y, z_valid], axis=1)
+            pts_world = all_points[offset:offset + count]
+            np.matmul(pts_cam, c2w[:3, :3].T, out=pts_world)
+            pts_world += c2w[:3, 3]
 
-            # Convert from OpenCV convention to glTF/OpenGL convention:
-            # OpenCV: Y-down, Z-forward (into scene)
-            # glTF:   Y-up, Z-backward (toward viewer)
-            pts_world[:, 1] = -pts_world[:, 1]  # Flip Y
-            pts_world[:, 2] = -pts_world[:, 2]  # Flip Z
-
-            # Get colors
+            # Get colors (normalized directly into the output slice)
             color_np = np.asarray(colors[i], dtype=np.uint8)
-            color_flat = color_np.reshape(-1, 3)[valid] / 255.0
+            np.divide(color_np.reshape(-1, 3)[valid], 255.0, out=all_colors[offset:offset + count])
 
-            all_points.append(pts_world)
-            all_colors.append(color_flat)
-
-        if not all_points:
-            raise RuntimeError("No valid points found in prediction")
+            offset += count
 
         pcd = o3d.geometry.PointCloud()
-        pcd.points = o3d.utility.Vector3dVector(np.vstack(all_points))
-        pcd.colors = o3d.utility.Vector3dVector(np.vstack(all_colors))
+        pcd.points = o3d.utility.Vector3dVector(all_points)
+        pcd.colors = o3d.utility.Vector3dVector(all_colors)
         return pcd
 
     def _export_pointcloud_to_glb(self, pcd: 'o3d.geometry.PointCloud', out_path: Path) -> None:
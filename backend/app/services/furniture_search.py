@@ -1,11 +1,15 @@
 import pandas as pd
 import numpy as np
+from collections import OrderedDict
 from pathlib import Path
 from typing import Optional
+import hashlib
 import logging
 import os
-from sentence_transformers import SentenceTransformer
-from sklearn.metrics.pairwise import cosine_similarity
+import tempfile
+import threading
+
+from ..config import settings
 
 logger = logging.getLogger(__name__)
 
@@ -26,6 +30,11 @@ SPONSORED_BRANDS = {
 BACKEND_DIR = Path(__file__).parent.parent.parent  # backend/app/services -> backend
 DATA_CSV_PATH = BACKEND_DIR.parent / "data" / "data.csv"  # project_root/data/data.csv
 
+EMBEDDINGS_CACHE_DIR = BACKEND_DIR / ".cache"  # backend/.cache
+
+# Maximum number of per-country boost-weighted embedding matrices kept in memory
+WEIGHTED_EMBEDDINGS_CACHE_SIZE = 32
+
 
 class FurnitureSearchService:
     """Service for semantic furniture product search."""
@@ -35,43 +44,213 @@ class FurnitureSearchService:
         self.csv_path = csv_path or str(DATA_CSV_PATH)
         self.df = None
         self.embedding_model = None
+        self.embedding_model_name = None
         self.product_embeddings = None
+        self._asin_to_idx: dict[str, int] = {}
+        self._brand_to_idxs: dict[str, np.ndarray] = {}
+        self._categories_lower = None
+        self._sponsor_weighted = None
+        self._weighted_embeddings_by_country: OrderedDict[str, np.ndarray] = OrderedDict()
         self._initialized = False
+        self._init_lock = threading.Lock()
         logger.info(f"FurnitureSearchService will use CSV at: {self.csv_path}")
 
     def _ensure_initialized(self):
-        """Lazy initialization of models and data."""
+        """Lazy initialization of models and data (thread-safe)."""
         if self._initialized:
             return
 
+        with self._init_lock:
+            if self._initialized:
+                return
+            self._initialize()
+
+    def _initialize(self):
+        """Load data, embedding model and product embeddings."""
         logger.info("Initializing FurnitureSearchService...")
-        
+
         # Load CSV
         logger.info(f"Loading furniture dataset from {self.csv_path}")
-        self.df = pd.read_csv(self.csv_path)
+        self.df = pd.read_csv(
+            self.csv_path,
+            engine='pyarrow',
+            dtype=str,
+        )
         logger.info(f"Loaded {len(self.df)} products")
 
-        # Load embedding model on GPU for faster inference
-        logger.info("Loading embedding model (all-MiniLM-L6-v2) on GPU...")
-        self.embedding_model = SentenceTransformer('all-MiniLM-L6-v2', device='cuda')
+        # Build lookup indexes (row positions) for ASIN and brand queries
+        self._asin_to_idx = {}
+        for idx, asin in enumerate(self.df['asin'].to_numpy()):
+            self._asin_to_idx.setdefault(asin, idx)
+        self._brand_to_idxs = self.df.groupby('brand').indices
+        self._categories_lower = self.df['categories'].fillna('').str.lower()
+
+        # Load embedding model
+        self._load_embedding_model()
+
+        # Create embeddings (or reuse the on-disk cache)
+        self.product_embeddings = self._load_or_create_embeddings()
+
+        # Fold the static sponsor boost into the embedding rows once, so a
+        # search is a single matrix-vector product with no post-multiplies
+        self._sponsor_weighted = self.product_embeddings * self._get_sponsor_boost()[:, None]
+        self._weighted_embeddings_by_country.clear()
 
-        # Create embeddings
-        logger.info("Creating product embeddings...")
-        self.product_embeddings = self._create_embeddings()
-        
         self._initialized = True
         logger.info("FurnitureSearchService initialized successfully")
 
+    def _load_embedding_model(self):
+        """
+        Load the embedding model for the configured backend.
+
+        "model2vec" uses a static (distilled) embedder: encoding is token
+        lookups + mean pooling, with no transformer forward pass.
+        "sentence-transformers" keeps the MiniLM transformer on GPU.
+        """
+        backend = settings.furniture_embedding_backend
+
+        if backend == "model2vec":
+            from model2vec import StaticModel
+
+            self.embedding_model_name = settings.furniture_static_model_name
+            logger.info(f"Loading static embedding model ({self.embedding_model_name})...")
+            self.embedding_model = StaticModel.from_pretrained(self.embedding_model_name)
+        elif backend == "sentence-transformers":
+            import torch
+            from sentence_transformers import SentenceTransformer
+
+            # Size intra-op threads to the CPUs this process may run on; inter-op
+            # threads can only be set before any parallel work has run
+            try:
+                num_cpus = len(os.sched_getaffinity(0))
+            except AttributeError:
+                num_cpus = os.cpu_count() or 4
+            torch.set_num_threads(num_cpus)
+            try:
+                torch.set_num_interop_threads(1)
+            except RuntimeError:
+                logger.debug("Inter-op thread count already fixed, leaving as is")
+
+            self.embedding_model_name = settings.furniture_transformer_model_name
+            logger.info(f"Loading embedding model ({self.embedding_model_name}) on GPU...")
+            self.embedding_model = SentenceTransformer(self.embedding_model_name, device='cuda')
+            self.embedding_model.eval()
+        else:
+            raise ValueError(f"Unknown furniture embedding backend: {backend}")
+
+    def _encode(self, texts, batch_size: int = 32) -> np.ndarray:
+        """
+        Encode a text (or list of texts) into L2-normalized float32 embeddings,
+        so that a plain dot product equals cosine similarity.
+        """
+        if settings.furniture_embedding_backend == "model2vec":
+            embeddings = self.embedding_model.encode(
+                texts, batch_size=batch_size, show_progress_bar=False
+            ).astype(np.float32, copy=False)
+            norms = np.linalg.norm(embeddings, axis=-1, keepdims=True)
+            return embeddings / np.maximum(norms, 1e-12)
+
+        import torch
+
+        with torch.inference_mode():
+            return self.embedding_model.encode(
+                texts,
+                batch_size=batch_size,
+                show_progress_bar=False,
+                convert_to_numpy=True,
+                normalize_embeddings=True,
+            )
+
+    def _embeddings_cache_path(self) -> Path:
+        """Cache file path keyed by CSV path, CSV mtime, row count and model."""
+        key_source = (
+            f"{self.csv_path}:{os.path.getmtime(self.csv_path)}:"
+            f"{len(self.df)}:{self.embedding_model_name}"
+        )
+        cache_key = hashlib.sha1(key_source.encode()).hexdigest()
+        return EMBEDDINGS_CACHE_DIR / f"{cache_key}.npy"
+
+    def _load_or_create_embeddings(self) -> np.ndarray:
+        """
+        Load product embeddings from the on-disk cache, creating and saving
+        them on a miss. Cached embeddings are memory-mapped read-only.
+        """
+        cache_path = self._embeddings_cache_path()
+
+        if cache_path.exists():
+            try:
+                logger.info(f"Loading cached product embeddings from {cache_path}")
+                return np.load(cache_path, mmap_mode='r')
+            except Exception as e:
+                logger.warning(f"Failed to load cached embeddings, recomputing: {e}")
+
+        logger.info("Creating product embeddings...")
+        embeddings = self._create_embeddings()
+
+        tmp_path = None
+        try:
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            # Unique temp file per writer: workers starting cold may all save
+            # the same cache, and each must publish only its own complete file
+            with tempfile.NamedTemporaryFile(
+                dir=cache_path.parent, prefix=cache_path.stem, suffix='.tmp.npy', delete=False
+            ) as tmp:
+                tmp_path = tmp.name
+                np.save(tmp, embeddings)
+            os.replace(tmp_path, cache_path)
+            logger.info(f"Saved product embeddings cache to {cache_path}")
+        except OSError as e:
+            logger.warning(f"Failed to save embeddings cache: {e}")
+            if tmp_path is not None and os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+
+        return embeddings
+
     def _create_embeddings(self) -> np.ndarray:
         """Create semantic embeddings for all products."""
-        product_texts = []
-        for _, row in self.df.iterrows():
-            text = f"{row.get('title', '')} {row.get('brand', '')} {row.get('categories', '')}"
-            product_texts.append(text)
+        product_texts = (
+            self.df['title'].fillna('') + ' '
+            + self.df['brand'].fillna('') + ' '
+            + self.df['categories'].fillna('')
+        ).tolist()
+
+        # Encode in length-sorted order so each batch has similar-length texts
+        # (less padding), then restore the original row order
+        order = np.argsort([len(text) for text in product_texts], kind='stable')
+        sorted_texts = [product_texts[i] for i in order]
+
+        sorted_embeddings = self._encode(sorted_texts, batch_size=128)
 
-        embeddings = self.embedding_model.encode(product_texts, convert_to_numpy=True)
+        embeddings = np.empty_like(sorted_embeddings)
+        embeddings[order] = sorted_embeddings
         return embeddings
 
+    def _get_weighted_embeddings(self, user_country: Optional[str]) -> np.ndarray:
+        """
+        Get the product embedding matrix with sponsor and country boosts
+        pre-multiplied into each row.
+
+        Matrices are cached per country (LRU, bounded by
+        WEIGHTED_EMBEDDINGS_CACHE_SIZE). Anonymous searches use the
+        sponsor-only matrix built at initialization.
+        """
+        if not user_country:
+            return self._sponsor_weighted
+
+        weighted = self._weighted_embeddings_by_country.get(user_country)
+        if weighted is not None:
+            self._weighted_embeddings_by_country.move_to_end(user_country)
+            return weighted
+
+        country_boost = self._get_country_boost(user_country)
+        weighted = self._sponsor_weighted * country_boost[:, None]
+
+        self._weighted_embeddings_by_country[user_country] = weighted
+        if len(self._weighted_embeddings_by_country) > WEIGHTED_EMBEDDINGS_CACHE_SIZE:
+            self._weighted_embeddings_by_country.popitem(last=False)
+
+        return weighted
+
     def search(self, query: str, top_k: int = 3, user_country: str = None) -> list[dict]:
         """
         Search for furniture products using semantic similarity.
@@ -97,22 +276,17 @@ class FurnitureSearchService:
         logger.info(f"Searching for: '{query}' (top_k={top_k}, user_country={user_country})")
 
         # Embed the query
-        query_embedding = self.embedding_model.encode(query, convert_to_numpy=True)
-
-        # Calculate similarity scores
-        similarities = cosine_similarity([query_embedding], self.product_embeddings)[0]
+        query_embedding = self._encode(query)
 
-        # Apply location-based boosting if user_country is provided
-        if user_country:
-            country_boost = self._get_country_boost(user_country)
-            similarities = similarities * country_boost
+        # Boosted cosine similarity: location and sponsor boosts are already
+        # folded into the weighted embedding rows
+        weighted_embeddings = self._get_weighted_embeddings(user_country)
+        similarities = weighted_embeddings @ query_embedding
 
-        # Apply sponsored brand boosting
-        sponsor_boost = self._get_sponsor_boost()
-        similarities = similarities * sponsor_boost
-
-        # Get top K indices
-        top_indices = np.argsort(similarities)[::-1][:top_k]
+        # Get top K indices (partial selection, then sort only the top K)
+        top_k = min(top_k, len(similarities))
+        top_indices = np.argpartition(similarities, -top_k)[-top_k:]
+        top_indices = top_indices[np.argsort(similarities[top_indices])[::-1]]
 
         # Prepare results
         results = []
@@ -155,7 +329,7 @@ class FurnitureSearchService:
                 break
 
         # Calculate boost factors
-        boost = np.ones(len(self.df))
+        boost = np.ones(len(self.df), dtype=np.float32)
         countries = self.df['country_of_origin'].fillna('')
 
         for i, country in enumerate(countries):
@@ -178,7 +352,7 @@ class FurnitureSearchService:
         Calculate boost factors for sponsored brands.
         Premium sponsors get higher boost.
         """
-        boost = np.ones(len(self.df))
+        boost = np.ones(len(self.df), dtype=np.float32)
         brands = self.df['brand'].fillna('')
 
         for i, brand in enumerate(brands):
@@ -199,12 +373,12 @@ class FurnitureSearchService:
         """
         self._ensure_initialized()
 
-        product = self.df[self.df['asin'] == asin]
-        if product.empty:
+        idx = self._asin_to_idx.get(asin)
+        if idx is None:
             logger.warning(f"Product not found: {asin}")
             return None
 
-        return product.iloc[0].to_dict()
+        return self.df.iloc[idx].to_dict()
 
     def get_products_by_brand(self, brand: str, limit: int = 10) -> list[dict]:
         """
@@ -219,8 +393,11 @@ class FurnitureSearchService:
         """
         self._ensure_initialized()
 
-        products = self.df[self.df['brand'] == brand].head(limit)
-        return [product.to_dict() for _, product in products.iterrows()]
+        idxs = self._brand_to_idxs.get(brand)
+        if idxs is None:
+            return []
+
+        return self.df.iloc[idxs[:limit]].to_dict(orient='records')
 
     def get_products_by_category(self, category: str, limit: int = 10) -> list[dict]:
         """
@@ -236,8 +413,9 @@ class FurnitureSearchService:
         self._ensure_initialized()
 
         # Categories are stored as strings like "['Home & Kitchen', 'Furniture', ...]"
-        products = self.df[self.df['categories'].str.contains(category, case=False, na=False)].head(limit)
-        return [product.to_dict() for _, product in products.iterrows()]
+        # Literal (non-regex) substring match against pre-lowercased categories
+        mask = self._categories_lower.str.contains(category.lower(), regex=False, na=False)
+        return self.df[mask].head(limit).to_dict(orient='records')
 
     def get_stats(self) -> dict:
         """
@@ -286,6 +464,20 @@ class FurnitureSearchService:
             "countries": countries
         }
 
+    def warm_up_in_background(self) -> threading.Thread:
+        """Start initialization in a daemon thread so the first query is fast."""
+        thread = threading.Thread(
+            target=self._warm_up, name="furniture-search-warmup", daemon=True
+        )
+        thread.start()
+        return thread
+
+    def _warm_up(self):
+        try:
+            self._ensure_initialized()
+        except Exception as e:
+            logger.error(f"FurnitureSearchService warm-up failed: {e}")
+
     def is_initialized(self) -> bool:
         """Check if service is initialized."""
         return self._initialized
@@ -7,31 +7,72 @@ This service handles:
 - Ultra-realistic prompt engineering for photorealistic results
 """
 
+import asyncio
 import base64
-import hashlib
+import binascii
+import heapq
 import io
 import logging
 import time
-from collections import OrderedDict
 from dataclasses import dataclass, field
-from datetime import datetime, timedelta
+from functools import lru_cache
 from typing import Optional, Any
 
+import xxhash
 from PIL import Image
 
 from ..config import settings
+from ..utils.base64_utils import base64_payload
 
 logger = logging.getLogger(__name__)
 
 
-@dataclass
+def _encode_bytes_to_base64(data: bytes) -> str:
+    """Base64-encode raw image bytes for an API response."""
+    return base64.b64encode(data).decode("utf-8")
+
+
+def request_key(
+    room_image_digest: str,
+    furniture_image_digest: str,
+    furniture_description: str,
+    target_location: Optional[str],
+    style_hints: Optional[str],
+    aspect_ratio: str
+) -> str:
+    """Key identifying a furniture replacement request (cache and in-flight)."""
+    # Non-cryptographic 128-bit hash: keys only need to be collision-free,
+    # not tamper-proof. Fields are fed incrementally (no joined string).
+    hasher = xxhash.xxh3_128()
+    for part in (
+        room_image_digest, furniture_image_digest,
+        furniture_description, str(target_location),
+        str(style_hints), aspect_ratio,
+    ):
+        hasher.update(part.encode())
+        hasher.update(b"|")
+    return hasher.hexdigest()
+
+
+def image_digest(image_b64: str) -> str:
+    """
+    128-bit digest identifying a base64-encoded image.
+
+    Hashes the full base64 payload (any data URL prefix is skipped), so two
+    images that only share their header bytes get different digests.
+    """
+    return xxhash.xxh3_128_hexdigest(base64_payload(image_b64))
+
+
+@dataclass(slots=True, frozen=True)
 class CacheEntry:
-    """A single cache entry with value and expiration time."""
-    value: str  # Base64 encoded image
+    """A single (immutable) cache entry with value and expiration time."""
+    value: bytes  # Raw image bytes (base64-encoded only when served)
     prompt: str
-    created_at: datetime
-    expires_at: datetime
+    created_at: float  # time.monotonic() (memory) / time.time() (redis) timestamp
+    expires_at: float  # time.monotonic() (memory) / time.time() (redis) timestamp
     generation_time: float
+    size_bytes: int  # Size of the stored image payload
 
 
 class ImageGenerationCache:
@@ -39,37 +80,59 @@ class ImageGenerationCache:
     LRU cache with TTL for generated images.
 
     Features:
-    - Maximum size limit with LRU eviction
-    - Time-to-live (TTL) for automatic expiration
-    - Thread-safe operations (using OrderedDict)
+    - Maximum entry count and total payload bytes, with LRU eviction
+    - Time-to-live (TTL) for automatic expiration, indexed by a min-heap of
+      (expires_at, key) with lazy deletion of stale heap entries
+    - Insertion-ordered dict as the LRU list (first key = least recently used)
     - Cache key based on input hash
     """
 
-    def __init__(self, max_size: int = 100, ttl_hours: float = 24.0):
+    # Whether calls do network I/O and must be kept off the event loop
+    blocking = False
+
+    def __init__(self, max_size: int = 100, ttl_hours: float = 24.0, max_bytes: int = 512 * 1024 * 1024):
         self.max_size = max_size
-        self.ttl = timedelta(hours=ttl_hours)
-        self._cache: OrderedDict[str, CacheEntry] = OrderedDict()
+        self._max_bytes = max_bytes
+        self._current_bytes = 0
+        self._ttl_seconds = ttl_hours * 3600
+        # Configuration part of stats, built once
+        self._static_stats = {
+            "max_size": max_size,
+            "max_bytes": max_bytes,
+            "ttl_hours": ttl_hours,
+        }
+        self._cache: dict[str, CacheEntry] = {}
+        self._expiry_heap: list[tuple[float, str]] = []
         self._hits = 0
         self._misses = 0
 
     def _generate_key(
         self,
-        room_image_b64: str,
-        furniture_image_b64: str,
+        room_image_digest: str,
+        furniture_image_digest: str,
         furniture_description: str,
         target_location: Optional[str],
         style_hints: Optional[str],
         aspect_ratio: str
     ) -> str:
         """Generate a unique cache key from input parameters."""
-        # Create a hash of all inputs
-        key_data = f"{room_image_b64[:100]}|{furniture_image_b64[:100]}|{furniture_description}|{target_location}|{style_hints}|{aspect_ratio}"
-        return hashlib.sha256(key_data.encode()).hexdigest()
+        return request_key(
+            room_image_digest, furniture_image_digest,
+            furniture_description, target_location,
+            style_hints, aspect_ratio
+        )
+
+    def _remove(self, key: str) -> Optional[CacheEntry]:
+        """Remove an entry (if present) and release its bytes from the budget."""
+        entry = self._cache.pop(key, None)
+        if entry is not None:
+            self._current_bytes -= entry.size_bytes
+        return entry
 
     def get(
         self,
-        room_image_b64: str,
-        furniture_image_b64: str,
+        room_image_digest: str,
+        furniture_image_digest: str,
         furniture_description: str,
         target_location: Optional[str],
         style_hints: Optional[str],
@@ -80,7 +143,7 @@ class ImageGenerationCache:
         Returns None if not found or expired.
         """
         key = self._generate_key(
-            room_image_b64, furniture_image_b64,
+            room_image_digest, furniture_image_digest,
             furniture_description, target_location,
             style_hints, aspect_ratio
         )
@@ -90,175 +153,325 @@ class ImageGenerationCache:
             self._misses += 1
             return None
 
-        # Check if expired
-        if datetime.now() > entry.expires_at:
-            del self._cache[key]
+        # Check if expired (its heap entry is dropped lazily)
+        if time.monotonic() > entry.expires_at:
+            self._remove(key)
             self._misses += 1
             return None
 
         # Move to end (most recently used)
-        self._cache.move_to_end(key)
+        self._cache[key] = self._cache.pop(key)
         self._hits += 1
         return entry
 
     def set(
         self,
-        room_image_b64: str,
-        furniture_image_b64: str,
+        room_image_digest: str,
+        furniture_image_digest: str,
         furniture_description: str,
         target_location: Optional[str],
         style_hints: Optional[str],
         aspect_ratio: str,
-        generated_image_b64: str,
+        generated_image: bytes,
         prompt: str,
         generation_time: float
     ) -> None:
         """Store a generated image in the cache."""
         key = self._generate_key(
-            room_image_b64, furniture_image_b64,
+            room_image_digest, furniture_image_digest,
             furniture_description, target_location,
             style_hints, aspect_ratio
         )
 
-        now = datetime.now()
+        size = len(generated_image)
+        if size > self._max_bytes:
+            logger.info(f"Not caching generated image: {size} bytes exceeds cache budget")
+            return
+
+        now = time.monotonic()
         entry = CacheEntry(
-            value=generated_image_b64,
+            value=generated_image,
             prompt=prompt,
             created_at=now,
-            expires_at=now + self.ttl,
-            generation_time=generation_time
+            expires_at=now + self._ttl_seconds,
+            generation_time=generation_time,
+            size_bytes=size
         )
 
-        # Remove oldest entries if at capacity
-        while len(self._cache) >= self.max_size:
-            self._cache.popitem(last=False)
+        # Replacing an existing key re-inserts it as most recently used
+        self._remove(key)
+
+        # Passively prune expired entries, then evict LRU entries while over
+        # the entry count or byte budget
+        self.cleanup_expired()
+        while self._cache and (
+            len(self._cache) >= self.max_size
+            or self._current_bytes + size > self._max_bytes
+        ):
+            self._remove(next(iter(self._cache)))
 
         self._cache[key] = entry
+        self._current_bytes += size
+        heapq.heappush(self._expiry_heap, (entry.expires_at, key))
+
+        # Keep the heap bounded when evictions leave many stale entries behind
+        if len(self._expiry_heap) > 2 * self.max_size:
+            self._expiry_heap = [(e.expires_at, k) for k, e in self._cache.items()]
+            heapq.heapify(self._expiry_heap)
 
     def clear(self) -> int:
         """Clear all cached entries. Returns number of entries cleared."""
         count = len(self._cache)
         self._cache.clear()
+        self._expiry_heap.clear()
+        self._current_bytes = 0
         self._hits = 0
         self._misses = 0
         return count
 
     def cleanup_expired(self) -> int:
         """Remove all expired entries. Returns number of entries removed."""
-        now = datetime.now()
-        expired_keys = [
-            key for key, entry in self._cache.items()
-            if now > entry.expires_at
-        ]
-        for key in expired_keys:
-            del self._cache[key]
-        return len(expired_keys)
+        now = time.monotonic()
+        heap = self._expiry_heap
+        removed = 0
+        while heap and heap[0][0] < now:
+            expires_at, key = heapq.heappop(heap)
+            # Skip stale heap entries (key evicted, expired on get, or replaced)
+            entry = self._cache.get(key)
+            if entry is not None and entry.expires_at == expires_at:
+                self._remove(key)
+                removed += 1
+        return removed
 
     @property
     def stats(self) -> dict:
         """Get cache statistics."""
+        lookups = self._hits + self._misses
         return {
+            **self._static_stats,
             "size": len(self._cache),
-            "max_size": self.max_size,
+            "size_bytes": self._current_bytes,
             "hits": self._hits,
             "misses": self._misses,
-            "hit_rate": self._hits / (self._hits + self._misses) if (self._hits + self._misses) > 0 else 0.0,
-            "ttl_hours": self.ttl.total_seconds() / 3600
+            "hit_rate": self._hits / lookups if lookups else 0.0,
         }
 
 
-class NanoBananaService:
+class RedisImageGenerationCache(ImageGenerationCache):
     """
-    AI-powered furniture replacement service using Google Gemini.
-
-    Features:
-    - Lazy loading of the Gemini client
-    - Ultra-realistic prompt engineering
-    - Result caching for identical requests
-    - Image encoding/decoding utilities
+    Image generation cache backed by Redis, shared by all worker processes.
+
+    Same interface as ImageGenerationCache. Entries are msgpack-encoded and
+    stored with SETEX, so Redis expires them. Two sorted sets index the
+    entries: last use (for LRU eviction beyond max_size or max_bytes) and
+    expiry time (for cleanup_expired); a hash holds each entry's payload
+    size for the byte budget. Hit/miss counters live in Redis so stats cover
+    every worker. Timestamps are wall-clock (time.time()), because
+    monotonic clocks are not comparable across processes.
     """
 
-    def __init__(self):
-        self._client: Optional[Any] = None
-        self._model_name: str = settings.gemini_model_name
-        self._cache: Optional[ImageGenerationCache] = None
-        self._initialized = False
+    blocking = True
 
-    def _ensure_client(self) -> Any:
-        """Lazily initialize the Google GenAI client."""
-        if self._client is None:
-            if not settings.gemini_api_key:
-                raise ValueError(
-                    "Gemini API key not configured. "
-                    "Set GARAZA_GEMINI_API_KEY environment variable."
-                )
+    def __init__(
+        self,
+        redis_url: str,
+        max_size: int = 100,
+        ttl_hours: float = 24.0,
+        max_bytes: int = 512 * 1024 * 1024,
+        prefix: str = "epipar:imgcache",
+    ):
+        super().__init__(max_size=max_size, ttl_hours=ttl_hours, max_bytes=max_bytes)
 
-            try:
-                from google import genai
-                self._client = genai.Client(api_key=settings.gemini_api_key)
-                logger.info(f"Initialized Gemini client with model: {self._model_name}")
-            except ImportError:
-                raise ImportError(
-                    "google-genai package not installed. "
-                    "Install with: pip install google-genai>=0.3.0"
-                )
+        try:
+            import msgpack
+            import redis
+        except ImportError:
+            raise ImportError(
+                "redis and msgpack packages not installed. "
+                "Install with: pip install redis>=5.0.0 msgpack>=1.0.0"
+            )
 
-        return self._client
+        self._msgpack = msgpack
+        self._redis = redis.Redis.from_url(redis_url)
+        self._prefix = prefix
+        self._lru_key = f"{prefix}:lru"
+        self._expiry_key = f"{prefix}:expiry"
+        self._sizes_key = f"{prefix}:sizes"
+        self._stats_key = f"{prefix}:stats"
+
+    def _entry_key(self, key: str) -> str:
+        return f"{self._prefix}:entry:{key}"
+
+    def _delete_entries(self, keys: list) -> None:
+        """Delete entries and their index members."""
+        if not keys:
+            return
+        keys = [k.decode() if isinstance(k, bytes) else k for k in keys]
+        pipe = self._redis.pipeline()
+        pipe.delete(*(self._entry_key(k) for k in keys))
+        pipe.zrem(self._lru_key, *keys)
+        pipe.zrem(self._expiry_key, *keys)
+        pipe.hdel(self._sizes_key, *keys)
+        pipe.execute()
 
-    def _ensure_cache(self) -> ImageGenerationCache:
-        """Lazily initialize the image generation cache."""
-        if self._cache is None:
-            self._cache = ImageGenerationCache(
-                max_size=settings.image_generation_cache_max_size,
-                ttl_hours=settings.image_generation_cache_ttl_hours
-            )
-        return self._cache
+    def get(
+        self,
+        room_image_digest: str,
+        furniture_image_digest: str,
+        furniture_description: str,
+        target_location: Optional[str],
+        style_hints: Optional[str],
+        aspect_ratio: str
+    ) -> Optional[CacheEntry]:
+        """
+        Get a cached entry if it exists and hasn't expired.
+        Returns None if not found or expired.
+        """
+        key = self._generate_key(
+            room_image_digest, furniture_image_digest,
+            furniture_description, target_location,
+            style_hints, aspect_ratio
+        )
 
-    def _decode_base64_to_pil(self, image_b64: str) -> Image.Image:
-        """Convert a base64-encoded image string to a PIL Image."""
-        # Handle data URL format (e.g., "data:image/png;base64,...")
-        if "," in image_b64:
-            image_b64 = image_b64.split(",", 1)[1]
+        data = self._redis.get(self._entry_key(key))
+        if data is None:
+            # Expired via SETEX (or never set): drop any stale index members
+            self._delete_entries([key])
+            self._redis.hincrby(self._stats_key, "misses", 1)
+            return None
 
-        image_data = base64.b64decode(image_b64)
-        return Image.open(io.BytesIO(image_data))
+        pipe = self._redis.pipeline()
+        pipe.zadd(self._lru_key, {key: time.time()})
+        pipe.hincrby(self._stats_key, "hits", 1)
+        pipe.execute()
 
-    def _encode_pil_to_base64(self, image: Image.Image, format: str = "PNG") -> str:
-        """Convert a PIL Image to a base64-encoded string."""
-        buffer = io.BytesIO()
-        image.save(buffer, format=format)
-        return base64.b64encode(buffer.getvalue()).decode("utf-8")
+        return CacheEntry(**self._msgpack.unpackb(data))
 
-    def _build_replacement_prompt(
+    def set(
         self,
+        room_image_digest: str,
+        furniture_image_digest: str,
         furniture_description: str,
-        target_location: Optional[str] = None,
-        style_hints: Optional[str] = None
-    ) -> str:
-        """
-        Build an ultra-realistic prompt for furniture replacement.
-
-        The prompt is engineered to produce photorealistic results with:
-        1. LIGHTING CONSISTENCY - Match existing room lighting
-        2. PERSPECTIVE MATCHING - Correct perspective and scale
-        3. MATERIAL REALISM - Accurate textures and materials
-        4. SHADOW CASTING - Natural shadow integration
-        5. COLOR INTEGRATION - Harmonize with room colors
-        6. EDGE BLENDING - Seamless edges with no artifacts
-        7. DEPTH OF FIELD - Match existing focus characteristics
-        """
+        target_location: Optional[str],
+        style_hints: Optional[str],
+        aspect_ratio: str,
+        generated_image: bytes,
+        prompt: str,
+        generation_time: float
+    ) -> None:
+        """Store a generated image in the cache."""
+        key = self._generate_key(
+            room_image_digest, furniture_image_digest,
+            furniture_description, target_location,
+            style_hints, aspect_ratio
+        )
 
-        location_instruction = ""
-        if target_location:
-            location_instruction = f"Place the furniture {target_location}."
-        else:
-            location_instruction = "Place the furniture in the most natural and aesthetically pleasing position in the room."
+        size = len(generated_image)
+        if size > self._max_bytes:
+            logger.info(f"Not caching generated image: {size} bytes exceeds cache budget")
+            return
+
+        now = time.time()
+        entry = {
+            "value": generated_image,
+            "prompt": prompt,
+            "created_at": now,
+            "expires_at": now + self._ttl_seconds,
+            "generation_time": generation_time,
+            "size_bytes": size,
+        }
 
-        style_instruction = ""
-        if style_hints:
-            style_instruction = f"Style guidance: {style_hints}."
+        # Replacing an existing key re-inserts it as most recently used;
+        # passively prune expired entries, then evict LRU entries while the
+        # new payload would exceed the byte budget
+        self._delete_entries([key])
+        self.cleanup_expired()
+        sizes = self._redis.hgetall(self._sizes_key)
+        total = sum(map(int, sizes.values()))
+        if total + size > self._max_bytes:
+            evict = []
+            for member in self._redis.zrange(self._lru_key, 0, -1):
+                if total + size <= self._max_bytes:
+                    break
+                evict.append(member)
+                total -= int(sizes.get(member, 0))
+            self._delete_entries(evict)
+
+        pipe = self._redis.pipeline()
+        pipe.setex(self._entry_key(key), max(1, int(self._ttl_seconds)), self._msgpack.packb(entry))
+        pipe.zadd(self._lru_key, {key: now})
+        pipe.zadd(self._expiry_key, {key: entry["expires_at"]})
+        pipe.hset(self._sizes_key, key, size)
+        pipe.execute()
+
+        # Evict LRU entries beyond the entry count
+        overflow = self._redis.zcard(self._lru_key) - self.max_size
+        if overflow > 0:
+            self._delete_entries(self._redis.zrange(self._lru_key, 0, overflow - 1))
 
-        prompt = f"""You are an expert interior designer and photorealistic image compositor. Your task is to seamlessly integrate new furniture into an existing room photograph.
+    def clear(self) -> int:
+        """Clear all cached entries. Returns number of entries cleared."""
+        keys = self._redis.zrange(self._lru_key, 0, -1)
+        self._delete_entries(keys)
+        self._redis.delete(self._lru_key, self._expiry_key, self._sizes_key, self._stats_key)
+        return len(keys)
+
+    def cleanup_expired(self) -> int:
+        """Remove index members of expired entries. Returns number removed."""
+        expired = self._redis.zrangebyscore(self._expiry_key, 0, time.time())
+        self._delete_entries(expired)
+        return len(expired)
+
+    @property
+    def stats(self) -> dict:
+        """Get cache statistics (shared across workers)."""
+        counters = self._redis.hgetall(self._stats_key)
+        hits = int(counters.get(b"hits", 0))
+        misses = int(counters.get(b"misses", 0))
+        lookups = hits + misses
+        return {
+            **self._static_stats,
+            "size": self._redis.zcard(self._lru_key),
+            "size_bytes": sum(map(int, self._redis.hvals(self._sizes_key))),
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": hits / lookups if lookups else 0.0,
+        }
+
+
+@lru_cache(maxsize=512)
+def _build_replacement_prompt(
+    furniture_description: str,
+    target_location: Optional[str] = None,
+    style_hints: Optional[str] = None
+) -> str:
+    """
+    Build an ultra-realistic prompt for furniture replacement.
+
+    Memoized: the prompt depends only on the (hashable) arguments, which are
+    often repeated across requests.
+
+    The prompt is engineered to produce photorealistic results with:
+    1. LIGHTING CONSISTENCY - Match existing room lighting
+    2. PERSPECTIVE MATCHING - Correct perspective and scale
+    3. MATERIAL REALISM - Accurate textures and materials
+    4. SHADOW CASTING - Natural shadow integration
+    5. COLOR INTEGRATION - Harmonize with room colors
+    6. EDGE BLENDING - Seamless edges with no artifacts
+    7. DEPTH OF FIELD - Match existing focus characteristics
+    """
+
+    location_instruction = ""
+    if target_location:
+        location_instruction = f"Place the furniture {target_location}."
+    else:
+        location_instruction = "Place the furniture in the most natural and aesthetically pleasing position in the room."
+
+    style_instruction = ""
+    if style_hints:
+        style_instruction = f"Style guidance: {style_hints}."
+
+    prompt = f"""You are an expert interior designer and photorealistic image compositor. Your task is to seamlessly integrate new furniture into an existing room photograph.
 
 FURNITURE TO PLACE: {furniture_description}
 
@@ -319,7 +532,96 @@ OUTPUT REQUIREMENTS:
 
 Generate the composite image now."""
 
-        return prompt
+    return prompt
+
+
+class NanoBananaService:
+    """
+    AI-powered furniture replacement service using Google Gemini.
+
+    Features:
+    - Lazy loading of the Gemini client
+    - Ultra-realistic prompt engineering
+    - Result caching for identical requests
+    - Image encoding/decoding utilities
+    """
+
+    def __init__(self):
+        self._client: Optional[Any] = None
+        self._model_name: str = settings.gemini_model_name
+        self._cache: Optional[ImageGenerationCache] = None
+        # Single-flight: identical concurrent requests share one generation
+        # task, which outlives any single (possibly cancelled) caller
+        self._inflight: dict[str, asyncio.Task] = {}
+        # Upper bound on concurrent Gemini generations
+        self._generation_semaphore = asyncio.Semaphore(settings.gemini_max_concurrent_requests)
+        self._initialized = False
+
+    def _ensure_client(self) -> Any:
+        """Lazily initialize the Google GenAI client."""
+        if self._client is None:
+            if not settings.gemini_api_key:
+                raise ValueError(
+                    "Gemini API key not configured. "
+                    "Set GARAZA_GEMINI_API_KEY environment variable."
+                )
+
+            try:
+                from google import genai
+                self._client = genai.Client(api_key=settings.gemini_api_key)
+                logger.info(f"Initialized Gemini client with model: {self._model_name}")
+            except ImportError:
+                raise ImportError(
+                    "google-genai package not installed. "
+                    "Install with: pip install google-genai>=0.3.0"
+                )
+
+        return self._client
+
+    def _ensure_cache(self) -> ImageGenerationCache:
+        """Lazily initialize the image generation cache."""
+        if self._cache is None:
+            if settings.image_generation_cache_backend == "redis":
+                self._cache = RedisImageGenerationCache(
+                    redis_url=settings.image_generation_cache_redis_url,
+                    max_size=settings.image_generation_cache_max_size,
+                    ttl_hours=settings.image_generation_cache_ttl_hours,
+                    max_bytes=settings.image_generation_cache_max_bytes
+                )
+                logger.info("Using Redis image generation cache")
+            else:
+                self._cache = ImageGenerationCache(
+                    max_size=settings.image_generation_cache_max_size,
+                    ttl_hours=settings.image_generation_cache_ttl_hours,
+                    max_bytes=settings.image_generation_cache_max_bytes
+                )
+        return self._cache
+
+    async def _call_cache(self, method, *args):
+        """Call a cache method, in a worker thread if the cache does network I/O."""
+        if self._cache.blocking:
+            return await asyncio.to_thread(method, *args)
+        return method(*args)
+
+    def _decode_base64_to_pil(self, image_b64: str) -> Image.Image:
+        """Convert a base64-encoded image string to a PIL Image."""
+        # Decode straight from the payload view (the data URL prefix is not
+        # stripped with a second copy); BytesIO shares the decoded bytes
+        image_data = binascii.a2b_base64(base64_payload(image_b64))
+        # Force the decode here (Image.open is lazy) so the CPU work stays on
+        # the calling worker thread and the encoded buffer can be released
+        image = Image.open(io.BytesIO(image_data))
+        image.load()
+        return image
+
+    def _build_replacement_prompt(
+        self,
+        furniture_description: str,
+        target_location: Optional[str] = None,
+        style_hints: Optional[str] = None
+    ) -> str:
+        """Build the furniture replacement prompt (see module-level builder)."""
+        return _build_replacement_prompt(furniture_description, target_location, style_hints)
 
     async def replace_furniture(
         self,
@@ -347,11 +649,19 @@ Generate the composite image now."""
         """
         start_time = time.time()
 
+        # Digest the full images once per request (cache and in-flight keys),
+        # off the event loop: each digest copies and hashes a multi-MB payload
+        room_image_digest, furniture_image_digest = await asyncio.gather(
+            asyncio.to_thread(image_digest, room_image_b64),
+            asyncio.to_thread(image_digest, furniture_image_b64),
+        )
+
         # Check cache first if enabled
         if settings.enable_image_generation_cache:
             cache = self._ensure_cache()
-            cached_entry = cache.get(
-                room_image_b64, furniture_image_b64,
+            cached_entry = await self._call_cache(
+                cache.get,
+                room_image_digest, furniture_image_digest,
                 furniture_description, target_location,
                 style_hints, aspect_ratio
             )
@@ -359,12 +669,58 @@ Generate the composite image now."""
             if cached_entry is not None:
                 logger.info("Cache hit for furniture replacement request")
                 return {
-                    "generated_image_base64": cached_entry.value,
+                    "generated_image_base64": await asyncio.to_thread(
+                        _encode_bytes_to_base64, cached_entry.value
+                    ),
                     "generation_time_seconds": cached_entry.generation_time,
                     "model_used": self._model_name,
                     "cache_hit": True
                 }
 
+        # Join an identical generation that is already in flight
+        key = request_key(
+            room_image_digest, furniture_image_digest,
+            furniture_description, target_location,
+            style_hints, aspect_ratio
+        )
+        task = self._inflight.get(key)
+        if task is not None:
+            logger.info("Joining in-flight generation for identical request")
+        else:
+            task = asyncio.create_task(self._generate_replacement(
+                room_image_b64, furniture_image_b64,
+                room_image_digest, furniture_image_digest,
+                furniture_description, target_location,
+                style_hints, aspect_ratio, start_time
+            ))
+            task.add_done_callback(lambda t: self._finish_inflight(key, t))
+            self._inflight[key] = task
+
+        # Shield the shared task: cancelling this caller must not cancel the
+        # generation other callers are waiting on
+        return dict(await asyncio.shield(task))
+
+    def _finish_inflight(self, key: str, task: asyncio.Task) -> None:
+        """Forget a finished in-flight generation."""
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        # Mark the outcome as retrieved even if every caller was cancelled
+        if not task.cancelled():
+            task.exception()
+
+    async def _generate_replacement(
+        self,
+        room_image_b64: str,
+        furniture_image_b64: str,
+        room_image_digest: str,
+        furniture_image_digest: str,
+        furniture_description: str,
+        target_location: Optional[str],
+        style_hints: Optional[str],
+        aspect_ratio: str,
+        start_time: float
+    ) -> dict:
+        """Generate a replacement image with Gemini and cache the result."""
         # Build the ultra-realistic prompt
         prompt = self._build_replacement_prompt(
             furniture_description, target_location, style_hints
@@ -373,9 +729,11 @@ Generate the composite image now."""
         # Initialize client
         client = self._ensure_client()
 
-        # Decode images
-        room_image = self._decode_base64_to_pil(room_image_b64)
-        furniture_image = self._decode_base64_to_pil(furniture_image_b64)
+        # Decode images off the event loop (PIL releases the GIL while decoding)
+        room_image, furniture_image = await asyncio.gather(
+            asyncio.to_thread(self._decode_base64_to_pil, room_image_b64),
+            asyncio.to_thread(self._decode_base64_to_pil, furniture_image_b64),
+        )
 
         logger.info(
             f"Generating furniture replacement: "
@@ -389,30 +747,32 @@ Generate the composite image now."""
             # where strings are text and PIL Images are automatically handled
             from google.genai import types
 
-            response = client.models.generate_content(
-                model=self._model_name,
-                contents=[
-                    prompt,  # Text prompt as string
-                    room_image,  # PIL Image - room screenshot
-                    furniture_image,  # PIL Image - furniture to place
-                ],
-                config=types.GenerateContentConfig(
-                    response_modalities=["IMAGE", "TEXT"],
+            async with self._generation_semaphore:
+                response = await asyncio.wait_for(
+                    client.aio.models.generate_content(
+                        model=self._model_name,
+                        contents=[
+                            prompt,  # Text prompt as string
+                            room_image,  # PIL Image - room screenshot
+                            furniture_image,  # PIL Image - furniture to place
+                        ],
+                        config=types.GenerateContentConfig(
+                            response_modalities=["IMAGE", "TEXT"],
+                        )
+                    ),
+                    settings.gemini_request_timeout,
                 )
-            )
 
-            # Extract the generated image from response
-            generated_image_b64 = None
+            # Extract the generated image (raw bytes) from response
+            generated_image = None
 
             for part in response.candidates[0].content.parts:
                 if hasattr(part, 'inline_data') and part.inline_data is not None:
                     # Image data is in inline_data
-                    generated_image_b64 = base64.b64encode(
-                        part.inline_data.data
-                    ).decode("utf-8")
+                    generated_image = part.inline_data.data
                     break
 
-            if generated_image_b64 is None:
+            if generated_image is None:
                 raise ValueError("No image generated in response")
 
             generation_time = time.time() - start_time
@@ -420,13 +780,18 @@ Generate the composite image now."""
             # Store in cache if enabled
             if settings.enable_image_generation_cache:
                 cache = self._ensure_cache()
-                cache.set(
-                    room_image_b64, furniture_image_b64,
+                await self._call_cache(
+                    cache.set,
+                    room_image_digest, furniture_image_digest,
                     furniture_description, target_location,
                     style_hints, aspect_ratio,
-                    generated_image_b64, prompt, generation_time
+                    generated_image, prompt, generation_time
                 )
 
+            generated_image_b64 = await asyncio.to_thread(
+                _encode_bytes_to_base64, generated_image
+            )
+
             logger.info(f"Furniture replacement completed in {generation_time:.2f}s")
 
             return {
@@ -436,15 +801,18 @@ Generate the composite image now."""
                 "cache_hit": False
             }
 
+        except asyncio.TimeoutError:
+            logger.error(f"Gemini request timed out after {settings.gemini_request_timeout}s")
+            raise
         except Exception as e:
             logger.error(f"Furniture replacement failed: {e}")
             raise
 
-    def get_status(self) -> dict:
+    async def get_status(self) -> dict:
         """Get the service status and cache statistics."""
         cache_stats = None
         if self._cache is not None:
-            cache_stats = self._cache.stats
+            cache_stats = await self._call_cache(lambda: self._cache.stats)
 
         return {
             "service": "nano_banana_pro",
@@ -455,12 +823,12 @@ Generate the composite image now."""
             "cache_stats": cache_stats
         }
 
-    def clear_cache(self) -> dict:
+    async def clear_cache(self) -> dict:
         """Clear the image generation cache."""
         if self._cache is None:
             return {"cleared": 0, "message": "Cache not initialized"}
 
-        count = self._cache.clear()
+        count = await self._call_cache(self._cache.clear)
         return {"cleared": count, "message": f"Cleared {count} cached entries"}
 
 
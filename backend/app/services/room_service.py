@@ -2,11 +2,13 @@
 Room service for managing stored rendered rooms.
 Handles CRUD operations and file management for user rooms.
 """
+import asyncio
 import os
 import shutil
 import logging
 from pathlib import Path
 from typing import Optional
+import orjson
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func, desc
 
@@ -20,6 +22,14 @@ logger = logging.getLogger(__name__)
 ROOMS_STORAGE_DIR = Path(__file__).parent.parent.parent / "data" / "rooms"
 ROOMS_STORAGE_DIR.mkdir(parents=True, exist_ok=True)
 
+def _copy_file(src: Path, dst: Path) -> int:
+    """
+    Copy a file with its metadata (shutil.copy2, which uses the platform's
+    kernel-side copy fast path). Returns the number of bytes copied.
+    """
+    shutil.copy2(src, dst)
+    return os.stat(dst).st_size
+
 
 async def get_room_by_id(db: AsyncSession, room_id: int, user_id: int) -> Optional[Room]:
     """Get a room by ID, ensuring it belongs to the user."""
@@ -44,23 +54,28 @@ async def get_rooms_by_user(
     page_size: int = 20,
 ) -> tuple[list[Room], int]:
     """Get all rooms for a user with pagination."""
-    # Get total count
-    count_result = await db.execute(
-        select(func.count(Room.id)).where(Room.user_id == user_id)
-    )
-    total = count_result.scalar() or 0
-
-    # Get paginated rooms
+    # Get paginated rooms and the total count in one round-trip: the window
+    # count is evaluated before OFFSET/LIMIT, so every row carries the total.
+    # Served by idx_room_user_created (user_id, created_at).
     offset = (page - 1) * page_size
     result = await db.execute(
-        select(Room)
+        select(Room, func.count().over().label("total"))
         .where(Room.user_id == user_id)
         .order_by(desc(Room.created_at))
         .offset(offset)
         .limit(page_size)
     )
-    rooms = list(result.scalars().all())
+    rows = result.all()
 
+    if rows:
+        total = rows[0].total
+    elif offset > 0:
+        # Page past the end: no rows to carry the window count
+        total = await get_user_room_count(db, user_id)
+    else:
+        total = 0
+
+    rooms = [row.Room for row in rows]
     return rooms, total
 
 
@@ -86,7 +101,6 @@ async def create_room_from_job(
 
     # Find and copy GLB files
     glb_files = list(job_dir.glob("*.glb"))
-    total_size = 0
     glb_file_path = None
     preview_glb_path = None
     medium_glb_path = None
@@ -98,11 +112,24 @@ async def create_room_from_job(
     room_subdir = room_storage / f"{room_uuid}_{job_id}"
     room_subdir.mkdir(parents=True, exist_ok=True)
 
+    # Look for thumbnail (first frame as JPG/PNG)
+    thumb_file = None
+    for ext in ["jpg", "jpeg", "png"]:
+        thumb_files = list(job_dir.glob(f"*.{ext}"))
+        if thumb_files:
+            thumb_file = thumb_files[0]
+            break
+
+    # Copy all GLB files and the thumbnail concurrently, off the event loop
+    files_to_copy = glb_files + ([thumb_file] if thumb_file else [])
+    copied_sizes = await asyncio.gather(*(
+        asyncio.to_thread(_copy_file, src, room_subdir / src.name)
+        for src in files_to_copy
+    ))
+    total_size = sum(copied_sizes)
+
     for glb_file in glb_files:
         dest_path = room_subdir / glb_file.name
-        shutil.copy2(glb_file, dest_path)
-        file_size = dest_path.stat().st_size
-        total_size += file_size
 
         # Categorize by LOD level based on filename
         if "preview" in glb_file.name.lower():
@@ -114,15 +141,8 @@ async def create_room_from_job(
             if glb_file_path is None:
                 glb_file_path = str(dest_path)
 
-    # Look for thumbnail (first frame as JPG/PNG)
-    for ext in ["jpg", "jpeg", "png"]:
-        thumb_files = list(job_dir.glob(f"*.{ext}"))
-        if thumb_files:
-            dest_thumb = room_subdir / thumb_files[0].name
-            shutil.copy2(thumb_files[0], dest_thumb)
-            thumbnail_path = str(dest_thumb)
-            total_size += dest_thumb.stat().st_size
-            break
+    if thumb_file:
+        thumbnail_path = str(room_subdir / thumb_file.name)
 
     # Extract metadata from job result
     frame_count = len(job_result.get("frames", []))
@@ -166,7 +186,9 @@ async def create_room_from_job(
         user_id=user.id,
         action="room_saved",
         description=f"Saved room: {room_data.name}",
-        metadata_json=f'{{"room_name": "{room_data.name}", "job_id": "{job_id}", "file_size": {total_size}}}'
+        metadata_json=orjson.dumps(
+            {"room_name": room_data.name, "job_id": job_id, "file_size": total_size}
+        ).decode()
     )
     db.add(activity)
 
@@ -210,13 +232,19 @@ async def delete_room(
         room.thumbnail_path,
     ]
 
-    for file_path in files_to_delete:
-        if file_path and os.path.exists(file_path):
-            try:
-                os.remove(file_path)
-                logger.debug(f"Deleted file: {file_path}")
-            except Exception as e:
-                logger.warning(f"Failed to delete file {file_path}: {e}")
+    # Remove files concurrently (each removal is a round-trip on slow storage)
+    paths = [p for p in files_to_delete if p]
+    results = await asyncio.gather(
+        *(asyncio.to_thread(os.remove, p) for p in paths),
+        return_exceptions=True,
+    )
+    for file_path, result in zip(paths, results):
+        if isinstance(result, FileNotFoundError):
+            continue
+        if isinstance(result, Exception):
+            logger.warning(f"Failed to delete file {file_path}: {result}")
+        else:
+            logger.debug(f"Deleted file: {file_path}")
 
     # Try to remove the room directory if empty
     if room.glb_file_path:
@@ -236,7 +264,9 @@ async def delete_room(
         user_id=user.id,
         action="room_deleted",
         description=f"Deleted room: {room.name}",
-        metadata_json=f'{{"room_name": "{room.name}", "room_id": {room.id}, "freed_bytes": {file_size}}}'
+        metadata_json=orjson.dumps(
+            {"room_name": room.name, "room_id": room.id, "freed_bytes": file_size}
+        ).decode()
     )
     db.add(activity)
 
@@ -248,40 +278,40 @@ async def delete_room(
     return True
 
 
+def _safe_stat(path: Optional[str]) -> Optional[os.stat_result]:
+    """Stat a file once; None if the path is unset or the file is missing."""
+    if not path:
+        return None
+    try:
+        return os.stat(path)
+    except OSError:
+        return None
+
+
 def build_room_response(room: Room) -> RoomResponse:
     """Build a RoomResponse from a Room model."""
     assets = []
 
-    # Build asset list
-    if room.glb_file_path:
-        assets.append(RoomAsset(
-            filename=Path(room.glb_file_path).name,
-            url=f"/api/rooms/{room.id}/assets/{Path(room.glb_file_path).name}",
-            format="glb",
-            lod_level="full",
-            file_size_bytes=int(Path(room.glb_file_path).stat().st_size) if os.path.exists(room.glb_file_path) else None,
-        ))
-
-    if room.preview_glb_path:
-        assets.append(RoomAsset(
-            filename=Path(room.preview_glb_path).name,
-            url=f"/api/rooms/{room.id}/assets/{Path(room.preview_glb_path).name}",
-            format="glb",
-            lod_level="preview",
-            file_size_bytes=int(Path(room.preview_glb_path).stat().st_size) if os.path.exists(room.preview_glb_path) else None,
-        ))
-
-    if room.medium_glb_path:
+    # Build asset list (one stat per file for existence + size)
+    for file_path, lod_level in (
+        (room.glb_file_path, "full"),
+        (room.preview_glb_path, "preview"),
+        (room.medium_glb_path, "medium"),
+    ):
+        if not file_path:
+            continue
+        st = _safe_stat(file_path)
+        filename = Path(file_path).name
         assets.append(RoomAsset(
-            filename=Path(room.medium_glb_path).name,
-            url=f"/api/rooms/{room.id}/assets/{Path(room.medium_glb_path).name}",
+            filename=filename,
+            url=f"/api/rooms/{room.id}/assets/{filename}",
             format="glb",
-            lod_level="medium",
-            file_size_bytes=int(Path(room.medium_glb_path).stat().st_size) if os.path.exists(room.medium_glb_path) else None,
+            lod_level=lod_level,
+            file_size_bytes=int(st.st_size) if st else None,
         ))
 
     thumbnail_url = None
-    if room.thumbnail_path and os.path.exists(room.thumbnail_path):
+    if _safe_stat(room.thumbnail_path):
         thumbnail_url = f"/api/rooms/{room.id}/thumbnail"
 
     return RoomResponse(
@@ -1,29 +1,136 @@
 import cv2
 import numpy as np
+import json
+import os
+import queue
+import shutil
+import subprocess
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
-from typing import Generator
+from typing import Generator, Optional, Sequence
 import logging
 
+from ..config import settings
+
 logger = logging.getLogger(__name__)
 
+# Below this many frames per worker a seek costs more than it saves
+MIN_FRAMES_PER_WORKER = 8
+# Seconds to wait for ffprobe before falling back to OpenCV
+FFPROBE_TIMEOUT = 10
+
+
+def _open_capture(video_path: Path, threads: int = 0) -> cv2.VideoCapture:
+    """
+    Open a video with the FFmpeg backend.
+
+    Forcing CAP_FFMPEG skips backend probing (GStreamer/MSMF) and keeps
+    decoding behaviour the same across platforms. threads sets libavcodec's
+    decoder thread count: 0 lets FFmpeg choose, 1 avoids oversubscription
+    when several captures decode in parallel.
+    """
+    return cv2.VideoCapture(
+        str(video_path), cv2.CAP_FFMPEG, [cv2.CAP_PROP_N_THREADS, threads]
+    )
+
+@lru_cache(maxsize=128)
+def _probe_video(path: str, mtime_ns: int, size: int) -> dict:
+    """
+    Read video metadata from the container header.
+
+    ffprobe only parses headers, whereas opening a VideoCapture also sets up
+    the decoder and reads the first packet. Falls back to OpenCV when ffprobe
+    is not installed or does not answer within FFPROBE_TIMEOUT. Cached per
+    (path, mtime, size) so re-probing an unchanged file is free.
+    """
+    if shutil.which("ffprobe"):
+        try:
+            result = subprocess.run(
+                [
+                    "ffprobe", "-v", "quiet", "-print_format", "json",
+                    "-select_streams", "v:0", "-show_streams", path,
+                ],
+                capture_output=True,
+                timeout=FFPROBE_TIMEOUT,
+            )
+        except subprocess.TimeoutExpired:
+            logger.warning(f"ffprobe timed out on {path}, probing with OpenCV")
+        else:
+            if result.returncode != 0:
+                raise ValueError(f"Failed to open video: {path}")
+            streams = json.loads(result.stdout).get("streams") or []
+            if not streams:
+                raise ValueError(f"Failed to open video: {path}")
+            stream = streams[0]
+
+            num, _, den = stream.get("avg_frame_rate", "0/1").partition("/")
+            den = float(den or 1)
+            fps = float(num) / den if den else 0.0
+            if "nb_frames" in stream:
+                frame_count = int(stream["nb_frames"])
+            else:
+                # Some containers (e.g. MKV/WebM) do not store a frame count
+                frame_count = int(round(float(stream.get("duration", 0)) * fps))
+
+            return {
+                "width": int(stream["width"]),
+                "height": int(stream["height"]),
+                "fps": fps,
+                "frame_count": frame_count,
+                "duration": frame_count / fps if fps else 0.0,
+            }
+
+    cap = _open_capture(path)
+    if not cap.isOpened():
+        raise ValueError(f"Failed to open video: {path}")
+
+    fps = cap.get(cv2.CAP_PROP_FPS)
+    frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    metadata = {
+        "width": int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
+        "height": int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+        "fps": fps,
+        "frame_count": frame_count,
+        "duration": frame_count / fps if fps else 0.0,
+    }
+    cap.release()
+    return metadata
+
+
+class _FramePool:
+    """Fixed set of reusable frame buffers, allocated on first use."""
+
+    def __init__(self, size: int):
+        self._size = size
+        self._free: queue.Queue[np.ndarray] = queue.Queue()
+        self._allocated = False
+
+    def get(self, shape: tuple[int, ...]) -> np.ndarray:
+        """Take a free buffer, blocking while all of them are in flight."""
+        if not self._allocated:
+            for _ in range(self._size):
+                self._free.put(np.empty(shape, dtype=np.uint8))
+            self._allocated = True
+        return self._free.get()
+
+    def put(self, buffer: np.ndarray) -> None:
+        """Return a buffer once the consumer is done with it."""
+        self._free.put(buffer)
+
+
 class VideoService:
     """Service for video frame extraction using OpenCV."""
 
     def get_video_metadata(self, video_path: Path) -> dict:
         """Get video metadata."""
-        cap = cv2.VideoCapture(str(video_path))
-        if not cap.isOpened():
+        try:
+            stat = os.stat(video_path)
+        except OSError:
             raise ValueError(f"Failed to open video: {video_path}")
-
-        metadata = {
-            "width": int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
-            "height": int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)),
-            "fps": cap.get(cv2.CAP_PROP_FPS),
-            "frame_count": int(cap.get(cv2.CAP_PROP_FRAME_COUNT)),
-            "duration": cap.get(cv2.CAP_PROP_FRAME_COUNT) / cap.get(cv2.CAP_PROP_FPS),
-        }
-        cap.release()
-        return metadata
+        # Copy so callers cannot mutate the cached entry
+        return dict(_probe_video(str(video_path), stat.st_mtime_ns, stat.st_size))
 
     def extract_frames(
         self,
@@ -40,43 +147,316 @@ class VideoService:
         Yields:
             Tuple of (frame_index, frame_rgb)
         """
-        cap = cv2.VideoCapture(str(video_path))
+        # Header probe (cached per file), shared with get_video_metadata
+        total_frames = self.get_video_metadata(video_path)["frame_count"]
+
+        cap = _open_capture(video_path)
         if not cap.isOpened():
             raise ValueError(f"Failed to open video: {video_path}")
 
-        total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
-
         # Adaptive interval: uniformly sample across entire video
         frames_to_extract = min(max_frames, total_frames)
-        adaptive_interval = max(1, total_frames // frames_to_extract)
+        adaptive_interval = max(1, total_frames // max(1, frames_to_extract))
 
         logger.info(f"Extracting {frames_to_extract} frames from {total_frames} total (interval: {adaptive_interval})")
 
         frame_count = 0
         extracted = 0
 
-        while cap.isOpened() and extracted < frames_to_extract:
-            ret, frame = cap.read()
-            if not ret:
-                break
+        try:
+            while extracted < frames_to_extract:
+                # grab() only demuxes; frames that are skipped are never decoded.
+                # Inter-frame codecs (H.264/H.265) still decode reference frames
+                # on retrieve(), so the saving is largest for intra-only
+                # streams such as MJPEG
+                if not cap.grab():
+                    break
 
-            if frame_count % adaptive_interval == 0:
-                # Convert BGR to RGB
-                frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                yield extracted, frame_rgb
-                extracted += 1
+                if frame_count % adaptive_interval == 0:
+                    ret, frame = cap.retrieve()
+                    if not ret:
+                        break
 
-            frame_count += 1
+                    # Convert BGR to RGB in place: retrieve() returns a fresh
+                    # array, so no second per-frame buffer is needed
+                    cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=frame)
+                    yield extracted, frame
+                    extracted += 1
+
+                frame_count += 1
+        finally:
+            cap.release()
 
-        cap.release()
         logger.info(f"Extracted {extracted} frames")
 
+    def stream_frames(
+        self,
+        video_path: Path,
+        max_frames: int = 128,
+        max_in_flight: int = 8,
+    ) -> Generator[tuple[int, np.ndarray], None, None]:
+        """
+        Extract frames like extract_frames, decoding ahead on a background thread.
+
+        Decoding overlaps with whatever the consumer does between frames. Frames
+        are decoded into a pool of max_in_flight reusable buffers, so a yielded
+        frame is only valid until the next one is requested; copy it to keep it.
+
+        Yields:
+            Tuple of (frame_index, frame_rgb)
+        """
+        # Header probe (cached per file), shared with get_video_metadata
+        total_frames = self.get_video_metadata(video_path)["frame_count"]
+
+        cap = _open_capture(video_path)
+        if not cap.isOpened():
+            raise ValueError(f"Failed to open video: {video_path}")
+        frames_to_extract = min(max_frames, total_frames)
+        adaptive_interval = max(1, total_frames // max(1, frames_to_extract))
+
+        pool = _FramePool(max_in_flight)
+        ready: queue.Queue = queue.Queue(maxsize=max_in_flight)
+        stop = threading.Event()
+        done = object()
+
+        def decode() -> None:
+            try:
+                frame_count = 0
+                extracted = 0
+                shape = None
+                while extracted < frames_to_extract and not stop.is_set():
+                    if not cap.grab():
+                        break
+
+                    if frame_count % adaptive_interval == 0:
+                        if shape is None:
+                            # The first frame sizes the pool
+                            ret, frame = cap.retrieve()
+                            if not ret:
+                                break
+                            shape = frame.shape
+                            buffer = pool.get(shape)
+                            buffer[...] = frame
+                        else:
+                            buffer = pool.get(shape)
+                            # Decode straight into the pooled buffer
+                            ret, frame = cap.retrieve(buffer)
+                            if not ret:
+                                pool.put(buffer)
+                                break
+                            if frame is not buffer:
+                                # OpenCV reallocated: the resolution changed
+                                logger.warning(f"Frame size changed at frame {frame_count}, stopping extraction")
+                                pool.put(buffer)
+                                break
+
+                        cv2.cvtColor(buffer, cv2.COLOR_BGR2RGB, dst=buffer)
+                        ready.put((extracted, buffer))
+                        extracted += 1
+
+                    frame_count += 1
+            except Exception as e:
+                ready.put(e)
+            finally:
+                cap.release()
+                ready.put(done)
+
+        decoder = threading.Thread(target=decode, daemon=True)
+        decoder.start()
+
+        try:
+            while True:
+                item = ready.get()
+                if item is done:
+                    break
+                if isinstance(item, Exception):
+                    raise item
+                index, buffer = item
+                yield index, buffer
+                pool.put(buffer)
+        finally:
+            # Consumer stopped early: unblock the decoder and let it finish
+            stop.set()
+            while decoder.is_alive():
+                try:
+                    item = ready.get(timeout=0.1)
+                except queue.Empty:
+                    continue
+                if isinstance(item, tuple):
+                    pool.put(item[1])
+            decoder.join()
+
+    def _read_interval(
+        self,
+        video_path: Path,
+        indices: Sequence[int],
+        out: np.ndarray,
+    ) -> int:
+        """
+        Decode one contiguous run of target frames into out.
+
+        Seeks once to the first index, then grabs forward and only retrieves
+        the targets. Returns how many frames were written.
+        """
+        # One decoder thread per capture: the workers are the parallelism
+        cap = _open_capture(video_path, threads=1)
+        try:
+            if not cap.isOpened():
+                return 0
+
+            position = indices[0]
+            if position > 0:
+                cap.set(cv2.CAP_PROP_POS_FRAMES, position)
+
+            for i, target in enumerate(indices):
+                while position < target:
+                    if not cap.grab():
+                        return i
+                    position += 1
+                if not cap.grab():
+                    return i
+                position += 1
+
+                # Decode straight into the shared output slot and convert in
+                # place, so no per-frame buffer is allocated
+                slot = out[i]
+                ret, frame = cap.retrieve(slot)
+                if not ret:
+                    return i
+                if frame is not slot:
+                    # OpenCV reallocated: the resolution changed mid-stream
+                    logger.warning(f"Frame size changed at frame {target}, stopping extraction")
+                    return i
+                cv2.cvtColor(slot, cv2.COLOR_BGR2RGB, dst=slot)
+            return len(indices)
+        finally:
+            cap.release()
+
+    def extract_frames_parallel(
+        self,
+        video_path: Path,
+        indices: Sequence[int],
+        workers: Optional[int] = None,
+    ) -> np.ndarray:
+        """
+        Decode the given (sorted) frame indices using several threads.
+
+        The indices are split into contiguous runs; each worker opens its own
+        capture, seeks once and decodes its run sequentially. OpenCV releases
+        the GIL while decoding, so runs proceed in parallel.
+
+        Args:
+            video_path: Path to video file
+            indices: Sorted frame indices to decode
+            workers: Number of decoding threads (defaults to CPU count)
+
+        Returns:
+            Array of shape [N, H, W, 3] (RGB, uint8). N is smaller than
+            len(indices) if the video ends early.
+        """
+        if len(indices) == 0:
+            return np.empty((0, 0, 0, 3), dtype=np.uint8)
+
+        # The first frame fixes the output shape (reported width/height can
+        # disagree with decoded frames for rotated videos)
+        cap = _open_capture(video_path)
+        try:
+            if not cap.isOpened():
+                raise ValueError(f"Failed to open video: {video_path}")
+            if indices[0] > 0:
+                cap.set(cv2.CAP_PROP_POS_FRAMES, indices[0])
+            ret, first = cap.read()
+        finally:
+            cap.release()
+        if not ret:
+            return np.empty((0, 0, 0, 3), dtype=np.uint8)
+
+        frames = np.empty((len(indices), *first.shape), dtype=np.uint8)
+        cv2.cvtColor(first, cv2.COLOR_BGR2RGB, dst=frames[0])
+
+        remaining = len(indices) - 1
+        workers = workers or os.cpu_count() or 1
+        workers = max(1, min(workers, remaining // MIN_FRAMES_PER_WORKER))
+        bounds = np.linspace(1, len(indices), workers + 1).astype(int)
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            counts = list(executor.map(
+                lambda b: self._read_interval(
+                    video_path, indices[b[0]:b[1]], frames[b[0]:b[1]]
+                ),
+                zip(bounds[:-1], bounds[1:]),
+            ))
+
+        # Keep only the frames before the first short run
+        extracted = len(indices)
+        for start, end, count in zip(bounds[:-1], bounds[1:], counts):
+            if count < end - start:
+                extracted = start + count
+                break
+
+        return frames[:extracted]
+
+    def extract_frames_decord(
+        self,
+        video_path: Path,
+        indices: Sequence[int],
+    ) -> np.ndarray:
+        """
+        Decode the given frame indices with Decord.
+
+        Decord seeks to the keyframe covering each index and decodes the batch
+        in native threads, returning RGB frames with no per-frame conversion.
+
+        Returns:
+            Array of shape [N, H, W, 3] (RGB, uint8)
+        """
+        from decord import VideoReader, cpu
+
+        reader = VideoReader(str(video_path), ctx=cpu(0), num_threads=os.cpu_count() or 1)
+        # Container frame counts are estimates; drop indices past the end
+        indices = [i for i in indices if i < len(reader)]
+        return reader.get_batch(indices).asnumpy()
+
+    def _collect_streamed_frames(self, video_path: Path, max_frames: int) -> list[np.ndarray]:
+        """Copy each pooled frame of stream_frames into a list the caller owns."""
+        frames = [frame.copy() for _, frame in self.stream_frames(video_path, max_frames)]
+        logger.info(f"Extracted {len(frames)} frames")
+        return frames
+
     def extract_frames_to_list(
         self,
         video_path: Path,
         max_frames: int = 128,
     ) -> list[np.ndarray]:
         """Extract frames as a list (loads all into memory)."""
-        return [frame for _, frame in self.extract_frames(video_path, max_frames)]
+        if settings.video_decoder not in ("decord", "opencv-parallel"):
+            # Sequential grab/retrieve (no seeks, so indices are exact on
+            # inter-coded streams), decoded ahead on a background thread
+            # while this thread copies each pooled frame out
+            return self._collect_streamed_frames(video_path, max_frames)
+
+        total_frames = self.get_video_metadata(video_path)["frame_count"]
+
+        # Same uniform sampling as extract_frames, decoded from seek points
+        frames_to_extract = min(max_frames, total_frames)
+        if frames_to_extract <= 0:
+            return []
+        adaptive_interval = max(1, total_frames // frames_to_extract)
+        indices = range(0, frames_to_extract * adaptive_interval, adaptive_interval)
+
+        logger.info(f"Extracting {frames_to_extract} frames from {total_frames} total (interval: {adaptive_interval})")
+
+        if settings.video_decoder == "decord":
+            try:
+                frames = self.extract_frames_decord(video_path, indices)
+            except Exception as e:
+                # Decord not installed or codec unsupported: use OpenCV
+                logger.warning(f"Decord decoding failed, falling back to OpenCV: {e}")
+                frames = self.extract_frames_parallel(video_path, indices)
+        else:
+            frames = self.extract_frames_parallel(video_path, indices)
+
+        logger.info(f"Extracted {len(frames)} frames")
+        return list(frames)
 
 video_service = VideoService()
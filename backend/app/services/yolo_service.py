@@ -2,13 +2,20 @@
 YOLO v8 service for furniture detection in images.
 Designed to be lightweight and detect furniture items from 2D screenshots of 3D scenes.
 """
+import asyncio
 import logging
-from typing import Optional
+from typing import Optional, Union
 import base64
 import io
+import threading
+import cv2
 import numpy as np
+from pathlib import Path
 from PIL import Image
 
+from ..config import settings
+from ..utils.base64_utils import base64_payload
+
 logger = logging.getLogger(__name__)
 
 # COCO class indices for furniture items
@@ -26,6 +33,13 @@ FURNITURE_CLASSES = {
     84: "book",  # Duplicate check
 }
 
+# Inference size (longest side) and letterbox padding, matching Ultralytics
+INFERENCE_SIZE = 640
+LETTERBOX_STRIDE = 32
+LETTERBOX_FILL = 114
+
+JPEG_MAGIC = b"\xff\xd8"
+
 # Class names we want to detect (for filtering)
 FURNITURE_CLASS_NAMES = {
     "chair", "couch", "sofa", "bed", "dining table", "table",
@@ -33,41 +47,209 @@ FURNITURE_CLASS_NAMES = {
 }
 
 
+_turbojpeg = None
+
+
+def _get_turbojpeg():
+    """Return a shared TurboJPEG decoder, or None if PyTurboJPEG is not installed."""
+    global _turbojpeg
+    if _turbojpeg is None:
+        try:
+            from turbojpeg import TurboJPEG
+            _turbojpeg = TurboJPEG()
+        except (ImportError, OSError):
+            # Package or libjpeg-turbo shared library missing
+            _turbojpeg = False
+    return _turbojpeg or None
+
+
+def _rgb_to_bgr(image: np.ndarray) -> np.ndarray:
+    """Return a contiguous BGR copy of an RGB image for Ultralytics' numpy path."""
+    return cv2.cvtColor(image, cv2.COLOR_RGB2BGR)
+
+
 class YOLOService:
     """Service for YOLO-based furniture detection."""
 
     def __init__(self):
         self._model = None
         self._device = None
+        self._load_lock = threading.Lock()
+        # Held for each inference, and before _load_lock when both are taken
+        self._infer_lock = threading.Lock()
+        # Pinned host staging buffer for GPU preprocessing (CUDA only)
+        self._pinned = None
+        self._pinned_slots = 0
+        # Furniture class IDs for the loaded model, as a set and a device LUT
+        self._furniture_ids: frozenset[int] = frozenset()
+        self._furniture_lut = None
 
     def _load_model(self):
         """Lazy-load the YOLO model on first use."""
         if self._model is not None:
             return
 
-        logger.info("Loading YOLOv8 model...")
+        # The startup warm-up thread and a request may race to load
+        with self._load_lock:
+            if self._model is not None:
+                return
+
+            logger.info("Loading YOLOv8 model...")
+            try:
+                from ultralytics import YOLO
+                import torch
+
+                # Use yolov8n (nano) for speed - lightweight as requested
+                # Options: yolov8n, yolov8s, yolov8m, yolov8l, yolov8x
+                model = YOLO("yolov8n.pt")
+
+                # Determine device
+                if torch.cuda.is_available():
+                    self._device = "cuda"
+                else:
+                    self._device = "cpu"
+
+                if settings.yolo_tensorrt and self._device == "cuda":
+                    model = self._load_exported(
+                        model, "engine",
+                        half=True, dynamic=True, imgsz=INFERENCE_SIZE, device=0,
+                    )
+                elif settings.yolo_onnx:
+                    model = self._load_exported(
+                        model, "onnx",
+                        dynamic=True, simplify=True, imgsz=INFERENCE_SIZE,
+                    )
+                elif settings.yolo_compile and self._device == "cuda":
+                    self._compile_model(model)
+
+                if self._device == "cuda":
+                    # Sized for a full batch of the largest letterboxed input;
+                    # views of the leading elements stay contiguous for any
+                    # smaller batch or shape
+                    self._pinned_slots = max(1, settings.yolo_max_batch_size)
+                    self._pinned = torch.empty(
+                        self._pinned_slots * 3 * INFERENCE_SIZE * INFERENCE_SIZE,
+                        dtype=torch.uint8, pin_memory=True,
+                    )
+
+                self._resolve_furniture_classes(model.names)
+
+                # Publish last: a set _model means everything above is ready
+                self._model = model
+                logger.info(f"YOLOv8 model loaded on {self._device}")
+            except Exception as e:
+                logger.error(f"Failed to load YOLOv8 model: {e}")
+                raise
+
+    def warm_up_in_background(self) -> threading.Thread:
+        """Load the model and run one dummy inference in a daemon thread."""
+        thread = threading.Thread(
+            target=self._warm_up, name="yolo-warmup", daemon=True
+        )
+        thread.start()
+        return thread
+
+    def _warm_up(self):
         try:
-            from ultralytics import YOLO
-            import torch
+            self._load_model()
+            # First inference initializes CUDA kernels and cuDNN algorithms
+            self.detect_furniture(np.zeros((INFERENCE_SIZE, INFERENCE_SIZE, 3), dtype=np.uint8))
+        except Exception as e:
+            logger.error(f"YOLOService warm-up failed: {e}")
 
-            # Use yolov8n (nano) for speed - lightweight as requested
-            # Options: yolov8n, yolov8s, yolov8m, yolov8l, yolov8x
-            self._model = YOLO("yolov8n.pt")
+    def _resolve_furniture_classes(self, names: dict[int, str]):
+        """Resolve furniture class names against the model's classes once."""
+        import torch
 
-            # Determine device
-            if torch.cuda.is_available():
-                self._device = "cuda"
-            else:
-                self._device = "cpu"
+        self._furniture_ids = frozenset(
+            class_id for class_id, name in names.items()
+            if name.lower() in FURNITURE_CLASS_NAMES
+        ) | frozenset(FURNITURE_CLASSES)
 
-            logger.info(f"YOLOv8 model loaded on {self._device}")
+        # Boolean class-ID lookup table: one gather per batch of boxes
+        lut = np.zeros(max(max(self._furniture_ids) + 1, len(names)), dtype=bool)
+        lut[list(self._furniture_ids)] = True
+        self._furniture_lut = torch.from_numpy(lut).to(self._device)
+
+    def _compile_model(self, model):
+        """
+        Compile the fused PyTorch network with CUDA graphs.
+
+        mode="reduce-overhead" records the forward pass once per input shape
+        and replays it afterwards, skipping per-layer Python dispatch. The
+        screenshot size rarely changes, so recompiles are rare.
+        """
+        import torch
+
+        try:
+            # Ultralytics builds its predictor (and fuses conv+bn) on first call
+            model(
+                np.zeros((INFERENCE_SIZE, INFERENCE_SIZE, 3), dtype=np.uint8),
+                device=self._device,
+                verbose=False,
+            )
+            backend = model.predictor.model
+            backend.model = torch.compile(backend.model, mode="reduce-overhead", dynamic=False)
+            logger.info("YOLOv8 network compiled with torch.compile")
+        except Exception as e:
+            logger.warning(f"torch.compile unavailable, running eager model: {e}")
+
+    def _load_exported(self, model, export_format: str, **export_args):
+        """
+        Swap the PyTorch checkpoint for an exported model.
+
+        "engine" is a TensorRT engine; "onnx" runs on ONNX Runtime (CUDA or
+        CPU execution provider). The export happens once next to the .pt
+        file and is reused on later loads. Falls back to the PyTorch model
+        if the runtime is unavailable.
+        """
+        from ultralytics import YOLO
+
+        export_path = Path(model.ckpt_path).with_suffix(f".{export_format}")
+        try:
+            if not export_path.exists():
+                logger.info(f"Exporting YOLOv8 {export_format} model (one-time)...")
+                export_path = Path(model.export(format=export_format, **export_args))
+            exported = YOLO(str(export_path), task="detect")
+            logger.info(f"Using exported YOLOv8 model: {export_path}")
+            return exported
         except Exception as e:
-            logger.error(f"Failed to load YOLOv8 model: {e}")
-            raise
+            logger.warning(f"YOLOv8 {export_format} model unavailable, using PyTorch model: {e}")
+            return model
+
+    def _preprocess_on_device(self, images: list[np.ndarray]):
+        """
+        Letterbox same-shape images into the pinned buffer and upload them as uint8.
+
+        Resizing happens on the host arrays, so only the small uint8 CHW
+        tensors cross PCIe; the float conversion runs on the GPU. Returns the
+        normalized [N, 3, H, W] tensor plus the scale and padding needed to
+        map boxes back to the original images.
+        """
+        height, width = images[0].shape[:2]
+        scale = min(INFERENCE_SIZE / width, INFERENCE_SIZE / height)
+        new_w, new_h = round(width * scale), round(height * scale)
+
+        # Pad to the stride like Ultralytics' rectangular letterbox
+        pad_w = (INFERENCE_SIZE - new_w) % LETTERBOX_STRIDE
+        pad_h = (INFERENCE_SIZE - new_h) % LETTERBOX_STRIDE
+        left, top = round(pad_w / 2 - 0.1), round(pad_h / 2 - 0.1)
+        out_w, out_h = new_w + pad_w, new_h + pad_h
+
+        count = len(images)
+        staging = self._pinned[: count * 3 * out_h * out_w].view(count, 3, out_h, out_w)
+        nchw = staging.numpy()
+        nchw.fill(LETTERBOX_FILL)
+        for chw, image in zip(nchw, images):
+            resized = cv2.resize(image, (new_w, new_h), interpolation=cv2.INTER_LINEAR)
+            chw[:, top:top + new_h, left:left + new_w] = resized.transpose(2, 0, 1)
+
+        tensor = staging.to(self._device, non_blocking=True).float().mul_(1 / 255.0)
+        return tensor, scale, left, top
 
     def detect_furniture(
         self,
-        image: Image.Image,
+        image: Union[Image.Image, np.ndarray],
         confidence_threshold: float = 0.3,
         iou_threshold: float = 0.5,
     ) -> list[dict]:
@@ -75,7 +257,7 @@ class YOLOService:
         Detect furniture items in an image.
 
         Args:
-            image: PIL Image to analyze
+            image: PIL Image or RGB uint8 array [H, W, 3] to analyze
             confidence_threshold: Minimum confidence score (0-1)
             iou_threshold: IoU threshold for NMS
 
@@ -86,72 +268,168 @@ class YOLOService:
             - bbox: dict with x, y, width, height (normalized 0-1)
             - center: dict with x, y (normalized 0-1)
         """
-        self._load_model()
-
         # Convert PIL image to numpy array
-        img_array = np.array(image)
+        img_array = image if isinstance(image, np.ndarray) else np.array(image)
+
+        # Serialized: the pinned staging buffer and the Ultralytics predictor
+        # are shared, and the warm-up inference may still be running
+        with self._infer_lock:
+            self._load_model()
+            detections = self._infer([img_array], confidence_threshold, iou_threshold)[0]
+
+        logger.info(f"Detected {len(detections)} furniture items")
+        return detections
+
+    def _infer(
+        self,
+        images: list[np.ndarray],
+        confidence_threshold: float,
+        iou_threshold: float,
+    ) -> list[list[dict]]:
+        """
+        Run one forward pass over same-shape RGB images (caller holds _infer_lock).
+
+        Every image goes through the same preprocessing whether it arrives
+        alone or in a batch, so its detections do not depend on batching.
+        """
+        img_height, img_width = images[0].shape[:2]
+
+        if self._pinned is not None:
+            # Preprocess ourselves so Ultralytics skips its CPU pipeline;
+            # boxes come back in letterboxed coordinates
+            source, scale, pad_x, pad_y = self._preprocess_on_device(images)
+        else:
+            # Ultralytics reads numpy input as BGR (cv2 order); same-shape
+            # inputs get its rectangular letterbox, as a lone image does
+            source, scale, pad_x, pad_y = [_rgb_to_bgr(image) for image in images], 1.0, 0, 0
 
         # Run inference
         results = self._model(
-            img_array,
+            source,
             conf=confidence_threshold,
             iou=iou_threshold,
             device=self._device,
             verbose=False,
         )
 
-        detections = []
-        img_width, img_height = image.size
-
-        for result in results:
-            boxes = result.boxes
-            if boxes is None:
-                continue
-
-            for i, box in enumerate(boxes):
-                # Get class info
-                class_id = int(box.cls[0])
-                class_name = result.names[class_id]
-                confidence = float(box.conf[0])
-
-                # Filter to furniture classes only
-                if class_name.lower() not in FURNITURE_CLASS_NAMES:
-                    # Also check by class ID
-                    if class_id not in FURNITURE_CLASSES:
-                        continue
-
-                # Get bounding box (xyxy format)
-                x1, y1, x2, y2 = box.xyxy[0].tolist()
-
-                # Calculate normalized coordinates (0-1)
-                bbox = {
-                    "x": x1 / img_width,
-                    "y": y1 / img_height,
-                    "width": (x2 - x1) / img_width,
-                    "height": (y2 - y1) / img_height,
-                }
-
-                # Calculate center point (normalized 0-1)
-                center = {
-                    "x": (x1 + x2) / 2 / img_width,
-                    "y": (y1 + y2) / 2 / img_height,
-                }
-
-                detections.append({
-                    "class_name": class_name,
-                    "confidence": round(confidence, 3),
-                    "bbox": bbox,
-                    "center": center,
-                    "pixel_bbox": {
-                        "x1": int(x1),
-                        "y1": int(y1),
-                        "x2": int(x2),
-                        "y2": int(y2),
-                    },
-                })
+        return [
+            self._postprocess(result, img_width, img_height, scale, pad_x, pad_y)
+            for result in results
+        ]
 
-        logger.info(f"Detected {len(detections)} furniture items")
-        return detections
+    def _postprocess(
+        self,
+        result,
+        img_width: int,
+        img_height: int,
+        scale: float = 1.0,
+        pad_x: float = 0,
+        pad_y: float = 0,
+    ) -> list[dict]:
+        """Convert one Ultralytics result into furniture detection dicts."""
+        import torch
+
+        boxes = result.boxes
+        if boxes is None or len(boxes) == 0:
+            return []
+
+        # Filter to furniture classes on the device with a LUT gather
+        cls = boxes.cls.to(torch.int64)
+        mask = self._furniture_lut[cls]
+
+        # One device->host transfer for all kept boxes: [x1, y1, x2, y2, conf, cls]
+        data = boxes.data[mask].cpu().numpy().astype(np.float64)
+        if len(data) == 0:
+            return []
+
+        # Bounding boxes (xyxy format) in original image pixels
+        xyxy = (data[:, :4] - (pad_x, pad_y, pad_x, pad_y)) / scale
+        np.clip(xyxy, 0, (img_width, img_height, img_width, img_height), out=xyxy)
+        x1, y1, x2, y2 = xyxy.T
+
+        # Normalized coordinates and center points (0-1)
+        norm_x, norm_y = x1 / img_width, y1 / img_height
+        norm_w, norm_h = (x2 - x1) / img_width, (y2 - y1) / img_height
+        center_x, center_y = (x1 + x2) / 2 / img_width, (y1 + y2) / 2 / img_height
+        pixel = xyxy.astype(np.int64)
+
+        return [
+            {
+                "class_name": result.names[class_id],
+                "confidence": round(confidence, 3),
+                "bbox": {"x": bx, "y": by, "width": bw, "height": bh},
+                "center": {"x": cx, "y": cy},
+                "pixel_bbox": {"x1": px1, "y1": py1, "x2": px2, "y2": py2},
+            }
+            for class_id, confidence, bx, by, bw, bh, cx, cy, (px1, py1, px2, py2) in zip(
+                data[:, 5].astype(np.int64).tolist(), data[:, 4].tolist(),
+                norm_x.tolist(), norm_y.tolist(), norm_w.tolist(), norm_h.tolist(),
+                center_x.tolist(), center_y.tolist(), pixel.tolist(),
+            )
+        ]
+
+    def detect_furniture_batch(
+        self,
+        images: list[np.ndarray],
+        confidence_threshold: float = 0.3,
+        iou_threshold: float = 0.5,
+    ) -> list[list[dict]]:
+        """
+        Detect furniture in several RGB images, batching same-shape images.
+
+        Images are grouped by shape and each group runs as one forward pass
+        through the single-image preprocessing. Returns one detection list
+        per input image, in order.
+        """
+        if len(images) == 1:
+            return [self.detect_furniture(images[0], confidence_threshold, iou_threshold)]
+
+        groups: dict[tuple[int, ...], list[int]] = {}
+        for index, image in enumerate(images):
+            groups.setdefault(image.shape, []).append(index)
+
+        batch: list[list[dict]] = [[] for _ in images]
+        with self._infer_lock:
+            self._load_model()
+            # The pinned buffer holds at most _pinned_slots images per pass
+            chunk = self._pinned_slots or len(images)
+            for indices in groups.values():
+                for start in range(0, len(indices), chunk):
+                    part = indices[start:start + chunk]
+                    results = self._infer(
+                        [images[i] for i in part], confidence_threshold, iou_threshold
+                    )
+                    for i, detections in zip(part, results):
+                        batch[i] = detections
+
+        logger.info(f"Detected {sum(map(len, batch))} furniture items in a batch of {len(images)}")
+        return batch
+
+    def decode_base64_image(self, image_base64: str) -> np.ndarray:
+        """Decode a base64 image (with or without data URI prefix) to RGB uint8."""
+        # Decode base64 to bytes, skipping any data URI prefix
+        image_bytes = base64.b64decode(base64_payload(image_base64))
+
+        turbojpeg = _get_turbojpeg() if image_bytes[:2] == JPEG_MAGIC else None
+        if turbojpeg is not None:
+            # libjpeg-turbo SIMD decode straight into an RGB array
+            from turbojpeg import TJPF_RGB
+            return turbojpeg.decode(image_bytes, pixel_format=TJPF_RGB)
+
+        # Load as PIL Image (PNG canvas screenshots, or no turbojpeg)
+        image = Image.open(io.BytesIO(image_bytes))
+        # For JPEGs, have libjpeg do the colour conversion while decoding
+        image.draft("RGB", image.size)
+
+        if image.mode == "L":
+            # Grayscale: broadcasting the channel is cheaper than convert()
+            gray = np.asarray(image)
+            return np.stack([gray] * 3, axis=-1)
+
+        # Convert to RGB if necessary (e.g., RGBA from canvas)
+        if image.mode != "RGB":
+            image = image.convert("RGB")
+        return np.asarray(image)
 
     def detect_from_base64(
         self,
@@ -170,32 +448,25 @@ class YOLOService:
         Returns:
             List of furniture detections
         """
-        # Remove data URI prefix if present
-        if "," in image_base64:
-            image_base64 = image_base64.split(",", 1)[1]
-
-        # Decode base64 to bytes
-        image_bytes = base64.b64decode(image_base64)
-
-        # Load as PIL Image
-        image = Image.open(io.BytesIO(image_bytes))
-
-        # Convert to RGB if necessary (e.g., RGBA from canvas)
-        if image.mode != "RGB":
-            image = image.convert("RGB")
-
         return self.detect_furniture(
-            image,
+            self.decode_base64_image(image_base64),
             confidence_threshold=confidence_threshold,
             iou_threshold=iou_threshold,
         )
 
     def unload_model(self):
         """Unload the model to free memory."""
-        if self._model is not None:
+        # Wait for any running inference or load before tearing down
+        with self._infer_lock, self._load_lock:
+            if self._model is None:
+                return
+
             del self._model
             self._model = None
             self._device = None
+            self._pinned = None
+            self._furniture_ids = frozenset()
+            self._furniture_lut = None
 
             # Clear CUDA cache if available
             try:
@@ -208,5 +479,76 @@ class YOLOService:
             logger.info("YOLOv8 model unloaded")
 
 
+class DetectionBatcher:
+    """
+    Coalesces concurrent detection requests into batched forward passes.
+
+    Requests arriving within max_wait seconds of the first one (up to
+    max_batch_size) share one model call, one per distinct threshold pair.
+    """
+
+    def __init__(self, service: YOLOService, max_batch_size: int = 8, max_wait: float = 0.005):
+        self._service = service
+        self._max_batch_size = max_batch_size
+        self._max_wait = max_wait
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+
+    async def detect(
+        self,
+        image: np.ndarray,
+        confidence_threshold: float = 0.3,
+        iou_threshold: float = 0.5,
+    ) -> list[dict]:
+        """Queue an RGB image for detection and wait for its results."""
+        if self._worker is None or self._worker.done():
+            self._queue = asyncio.Queue()
+            self._worker = asyncio.create_task(self._run())
+
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((image, confidence_threshold, iou_threshold, future))
+        return await future
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self._max_wait
+            while len(batch) < self._max_batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            groups: dict[tuple[float, float], list] = {}
+            for item in batch:
+                groups.setdefault((item[1], item[2]), []).append(item)
+
+            for (conf, iou), items in groups.items():
+                try:
+                    results = await asyncio.to_thread(
+                        self._service.detect_furniture_batch,
+                        [item[0] for item in items], conf, iou,
+                    )
+                except Exception as e:
+                    for item in items:
+                        if not item[3].done():
+                            item[3].set_exception(e)
+                    continue
+
+                for item, detections in zip(items, results):
+                    # The request may have been cancelled while waiting
+                    if not item[3].done():
+                        item[3].set_result(detections)
+
+
 # Singleton instance
 yolo_service = YOLOService()
+detection_batcher = DetectionBatcher(
+    yolo_service,
+    max_batch_size=settings.yolo_max_batch_size,
+    max_wait=settings.yolo_batch_wait_ms / 1000,
+)
@@ -0,0 +1,18 @@
+"""Helpers for base64-encoded images sent by the frontend."""
+
+# Data URI prefixes ("data:image/png;base64,") are short; a comma further in
+# is malformed input, not a prefix
+MAX_DATA_URI_PREFIX = 64
+
+
+def base64_payload(image_base64: str) -> memoryview:
+    """
+    Return the base64 payload of an image string, without any data URI prefix.
+
+    Encoding the str to ASCII bytes copies the payload once; the prefix is
+    then skipped by slicing a memoryview, so str.split does not copy it a
+    second time.
+    """
+    data = memoryview(image_base64.encode("ascii"))
+    comma = image_base64.find(",", 0, MAX_DATA_URI_PREFIX)
+    return data[comma + 1:] if comma >= 0 else data
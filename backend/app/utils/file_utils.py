@@ -2,6 +2,8 @@ import uuid
 import aiofiles
 import shutil
 import os
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from datetime import datetime, timedelta
 from typing import Optional
@@ -9,6 +11,17 @@ from fastapi import UploadFile
 
 from ..config import settings
 
+# Concurrent directory walks when sizing jobs (scandir/stat release the GIL)
+JOB_SIZE_WORKERS = 16
+# Concurrent job deletions in cleanup_old_jobs
+JOB_DELETE_WORKERS = 8
+# Uploads are written in chunks of this size, never held in memory whole
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+# get_disk_usage results are reused for this long (seconds) per path
+DISK_USAGE_TTL = 1.0
+
+_disk_usage_cache: dict[str, tuple[float, dict]] = {}
+
 async def save_upload_file(upload_file: UploadFile) -> tuple[str, Path]:
     """
     Save uploaded file and return job_id and path.
@@ -16,7 +29,7 @@ async def save_upload_file(upload_file: UploadFile) -> tuple[str, Path]:
     Returns:
         Tuple of (job_id, file_path)
     """
-    job_id = str(uuid.uuid4())
+    job_id = uuid.uuid4().hex
 
     # Create job directory
     job_dir = settings.temp_dir / job_id
@@ -28,19 +41,55 @@ async def save_upload_file(upload_file: UploadFile) -> tuple[str, Path]:
 
     # Save file
     async with aiofiles.open(file_path, 'wb') as f:
-        content = await upload_file.read()
-        await f.write(content)
+        while chunk := await upload_file.read(UPLOAD_CHUNK_SIZE):
+            await f.write(chunk)
 
     return job_id, file_path
 
+def fast_rmtree(path: str):
+    """
+    Remove a directory tree.
+
+    Like shutil.rmtree, but uses the DirEntry types from scandir instead of
+    an extra stat per entry. Symlinks inside the tree are unlinked, never
+    followed; a symlink as the top-level path raises OSError, as in shutil.
+    """
+    if os.path.islink(path):
+        raise OSError("Cannot call rmtree on a symbolic link")
+    _rmtree_entries(path)
+
+def _rmtree_entries(path: str):
+    """Remove a directory known not to be a symlink, and everything in it."""
+    with os.scandir(path) as it:
+        for entry in it:
+            if entry.is_dir(follow_symlinks=False):
+                _rmtree_entries(entry.path)
+            else:
+                os.unlink(entry.path)
+    os.rmdir(path)
+
 def cleanup_job(job_id: str):
     """Clean up job files."""
     job_dir = settings.temp_dir / job_id
     if job_dir.exists():
-        shutil.rmtree(job_dir)
+        fast_rmtree(job_dir)
+        # Usage changed; don't serve the pre-delete figures
+        _disk_usage_cache.clear()
 
 def get_disk_usage(path: Path) -> dict:
-    """Get disk usage statistics for a path."""
+    """Get disk usage statistics for a path (cached for DISK_USAGE_TTL seconds)."""
+    key = str(path)
+    now = time.monotonic()
+    cached = _disk_usage_cache.get(key)
+    if cached is not None and now - cached[0] <= DISK_USAGE_TTL:
+        return dict(cached[1])
+
+    usage = _read_disk_usage(path)
+    _disk_usage_cache[key] = (now, usage)
+    return dict(usage)
+
+def _read_disk_usage(path: Path) -> dict:
+    """Read disk usage statistics for a path from the filesystem."""
     try:
         stat = os.statvfs(path)
         total_bytes = stat.f_blocks * stat.f_frsize
@@ -72,33 +121,56 @@ def get_disk_usage(path: Path) -> dict:
                 "used_percent": 0,
             }
 
-def get_job_directories() -> list[dict]:
-    """Get list of all job directories with their sizes and modification times."""
+def _dir_size(path: str) -> int:
+    """Total size of the files under path (iterative scandir walk)."""
+    total = 0
+    stack = [path]
+    while stack:
+        with os.scandir(stack.pop()) as it:
+            for entry in it:
+                # DirEntry type checks come from the directory listing itself
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                elif entry.is_file(follow_symlinks=False):
+                    total += entry.stat(follow_symlinks=False).st_size
+    return total
+
+def get_job_directories(compute_sizes: bool = True) -> list[dict]:
+    """
+    Get list of all job directories with their sizes and modification times.
+
+    Args:
+        compute_sizes: Walk each job to total its size. When False,
+                       size_bytes and size_gb are None.
+    """
     if not settings.temp_dir.exists():
         return []
     
-    jobs = []
-    for item in settings.temp_dir.iterdir():
-        if item.is_dir():
-            try:
-                # Calculate directory size
-                total_size = sum(
-                    f.stat().st_size for f in item.rglob('*') if f.is_file()
-                )
-                
-                # Get modification time
-                mtime = datetime.fromtimestamp(item.stat().st_mtime)
-                
-                jobs.append({
-                    "job_id": item.name,
-                    "size_bytes": total_size,
-                    "size_gb": round(total_size / (1024**3), 4),
-                    "modified": mtime.isoformat(),
-                    "age_hours": (datetime.now() - mtime).total_seconds() / 3600,
-                })
-            except Exception as e:
-                # Skip directories we can't read
-                continue
+    with os.scandir(settings.temp_dir) as it:
+        job_dirs = [entry for entry in it if entry.is_dir(follow_symlinks=False)]
+
+    def describe(entry: os.DirEntry) -> Optional[dict]:
+        try:
+            # Calculate directory size
+            total_size = _dir_size(entry.path) if compute_sizes else None
+            
+            # Get modification time
+            mtime = datetime.fromtimestamp(entry.stat(follow_symlinks=False).st_mtime)
+        except Exception:
+            # Skip directories we can't read
+            return None
+        
+        return {
+            "job_id": entry.name,
+            "size_bytes": total_size,
+            "size_gb": round(total_size / (1024**3), 4) if compute_sizes else None,
+            "modified": mtime.isoformat(),
+            "age_hours": (datetime.now() - mtime).total_seconds() / 3600,
+        }
+    
+    # Size jobs concurrently so several directory walks are in flight
+    with ThreadPoolExecutor(max_workers=JOB_SIZE_WORKERS) as executor:
+        jobs = [job for job in executor.map(describe, job_dirs) if job is not None]
     
     return sorted(jobs, key=lambda x: x["modified"], reverse=True)
 
@@ -114,7 +186,9 @@ def cleanup_old_jobs(max_age_hours: Optional[float] = None, dry_run: bool = Fals
     Returns:
         Dictionary with cleanup statistics.
     """
-    jobs = get_job_directories()
+    # A real run sizes only the jobs it deletes (just before removing them),
+    # so only a dry run needs to walk every job for its size
+    jobs = get_job_directories(compute_sizes=dry_run)
     now = datetime.now()
     
     to_delete = []
@@ -130,20 +204,30 @@ def cleanup_old_jobs(max_age_hours: Optional[float] = None, dry_run: bool = Fals
         
         if should_delete:
             to_delete.append(job)
-            total_size += job["size_bytes"]
+            if dry_run:
+                total_size += job["size_bytes"]
     
     if not dry_run:
         deleted_count = 0
         deleted_size = 0
         errors = []
         
-        for job in to_delete:
+        def delete(job: dict) -> tuple[int, Optional[dict]]:
             try:
+                size = _dir_size(str(settings.temp_dir / job["job_id"]))
                 cleanup_job(job["job_id"])
-                deleted_count += 1
-                deleted_size += job["size_bytes"]
             except Exception as e:
-                errors.append({"job_id": job["job_id"], "error": str(e)})
+                return 0, {"job_id": job["job_id"], "error": str(e)}
+            return size, None
+        
+        # Delete several jobs at once; unlink/rmdir release the GIL
+        with ThreadPoolExecutor(max_workers=JOB_DELETE_WORKERS) as executor:
+            for size, error in executor.map(delete, to_delete):
+                if error is None:
+                    deleted_count += 1
+                    deleted_size += size
+                else:
+                    errors.append(error)
         
         return {
             "deleted_count": deleted_count,
@@ -20,22 +20,30 @@ except ImportError:
     print("  pip install --ignore-installed blinker git+https://github.com/ByteDance-Seed/Depth-Anything-3.git", file=sys.stderr)
     sys.exit(1)
 
+import threading
 import uvicorn
 
-# Clear any leftover CUDA memory from previous runs
-try:
-    import torch
-    if torch.cuda.is_available():
-        torch.cuda.empty_cache()
-        torch.cuda.synchronize()
-        # Log GPU memory status
-        total = torch.cuda.get_device_properties(0).total_memory / (1024**3)
-        reserved = torch.cuda.memory_reserved(0) / (1024**3)
-        allocated = torch.cuda.memory_allocated(0) / (1024**3)
-        print(f"GPU Memory: {total:.1f}GB total, {reserved:.1f}GB reserved, {allocated:.1f}GB allocated")
-        print(f"CUDA allocator: {os.environ.get('PYTORCH_CUDA_ALLOC_CONF', 'default')}")
-except Exception as e:
-    print(f"CUDA init note: {e}")
+
+def _warm_cuda():
+    """Clear leftover CUDA memory and log GPU status (runs off the startup path)."""
+    try:
+        import torch
+        if torch.cuda.is_available():
+            torch.cuda.empty_cache()
+            torch.cuda.synchronize()
+            # Log GPU memory status
+            total = torch.cuda.get_device_properties(0).total_memory / (1024**3)
+            reserved = torch.cuda.memory_reserved(0) / (1024**3)
+            allocated = torch.cuda.memory_allocated(0) / (1024**3)
+            print(f"GPU Memory: {total:.1f}GB total, {reserved:.1f}GB reserved, {allocated:.1f}GB allocated")
+            print(f"CUDA allocator: {os.environ.get('PYTORCH_CUDA_ALLOC_CONF', 'default')}")
+    except Exception as e:
+        print(f"CUDA init note: {e}")
+
+
+# Clear any leftover CUDA memory from previous runs without delaying the
+# server from binding its socket
+threading.Thread(target=_warm_cuda, daemon=True).start()
 
 if __name__ == "__main__":
     uvicorn.run(